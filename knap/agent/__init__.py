@@ -1,5 +1,18 @@
 """Agent core - agentic loop with OpenAI."""
 
-from .core import Agent, AgentResponse, ProgressUpdate
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .core import Agent, AgentResponse, ProgressUpdate
 
 __all__ = ["Agent", "AgentResponse", "ProgressUpdate"]
+
+
+def __getattr__(name: str):
+    # Import core lazily: knap.storage imports knap.agent.planning, and loading
+    # core (and the OpenAI SDK) from here would make that a circular import.
+    if name in __all__:
+        from . import core
+
+        return getattr(core, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
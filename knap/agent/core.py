@@ -87,26 +87,52 @@ class Agent:
         self.task_lists: dict[int, TaskList] = {}
         self._current_user_id: int | None = None  # Set during message processing
 
+        # (KNAP.md stat stamp, parsed guidelines) from the last read
+        self._guidelines_cache: tuple[tuple[int, int] | None, str | None] | None = None
+
         # Create tools with callbacks
         self.tools = create_tool_registry(
             settings.vault_path,
             settings_storage=self.user_settings,
             refresh_callback=self.refresh_index,
             task_update_callback=self._update_tasks,
+            index_provider=self.vault_index.get_cached_index,
         )
 
     def clear_history(self, user_id: int) -> None:
         """Clear conversation history for a user."""
         self.history.clear(user_id)
 
-    def _get_user_guidelines(self) -> str | None:
-        """Read custom user guidelines from KNAP.md in vault root."""
-        shard_note = self.settings.vault_path / KNAP_NOTE_NAME
-        if not shard_note.exists():
+    def _read_guidelines_file(self) -> str | None:
+        """Return the raw contents of KNAP.md, or None if it doesn't exist."""
+        try:
+            return (self.settings.vault_path / KNAP_NOTE_NAME).read_text(encoding="utf-8")
+        except FileNotFoundError:
             return None
 
+    def _get_user_guidelines(self) -> str | None:
+        """Read custom user guidelines from KNAP.md in vault root.
+
+        The parsed result is reused until the file's mtime or size changes.
+        """
         try:
-            content = shard_note.read_text(encoding="utf-8")
+            st = (self.settings.vault_path / KNAP_NOTE_NAME).stat()
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        if self._guidelines_cache is not None and self._guidelines_cache[0] == stamp:
+            return self._guidelines_cache[1]
+
+        guidelines = self._parse_user_guidelines()
+        self._guidelines_cache = (stamp, guidelines)
+        return guidelines
+
+    def _parse_user_guidelines(self) -> str | None:
+        """Read KNAP.md and strip its frontmatter."""
+        try:
+            content = self._read_guidelines_file()
+            if content is None:
+                return None
             # Strip frontmatter if present
             if content.startswith("---"):
                 parts = content.split("---", 2)
@@ -144,6 +170,7 @@ class Agent:
 
     def refresh_index(self) -> None:
         """Force a refresh of the vault index."""
+        self._guidelines_cache = None
         self.vault_index.rebuild()
 
     def _update_tasks(self, tasks: list[Task]) -> None:
@@ -341,14 +368,26 @@ class Agent:
 
     # ─────────────────────────────────────────────────────────────────────────
 
-    async def transcribe_audio(self, audio_path: Path) -> str | None:
-        """Transcribe audio file using OpenAI Whisper."""
+    async def transcribe_audio(
+        self, audio: Path | bytes, filename: str = "voice.ogg"
+    ) -> str | None:
+        """Transcribe audio using OpenAI Whisper.
+
+        Accepts either a path on disk or the raw audio bytes (filename is used
+        to tell Whisper the container format when passing bytes).
+        """
         try:
-            with open(audio_path, "rb") as audio_file:
+            if isinstance(audio, bytes):
                 response = self.client.audio.transcriptions.create(
                     model="whisper-1",
-                    file=audio_file,
+                    file=(filename, audio),
                 )
+            else:
+                with open(audio, "rb") as audio_file:
+                    response = self.client.audio.transcriptions.create(
+                        model="whisper-1",
+                        file=audio_file,
+                    )
             return response.text
         except Exception as e:
             logger.error(f"{Colors.RED}Transcription failed: {e}{Colors.RESET}")
@@ -0,0 +1,83 @@
+"""Low-level note walking, reading and writing, shared by the scanner, tools and storage."""
+
+import os
+import tempfile
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+# Process umask, used to give newly created files the usual default permissions
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def walk_md(root: Path) -> Iterator[tuple[Path, Callable[[], os.stat_result]]]:
+    """Yield markdown files under root with their stat callables, skipping hidden entries."""
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+
+    for entry in entries:
+        if entry.name.startswith("."):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            yield from walk_md(Path(entry.path))
+        elif entry.name.endswith(".md"):
+            yield Path(entry.path), entry.stat
+
+
+def read_fd(fd: int, size: int) -> bytes:
+    """Read a whole file, normally in a single read() given its size from fstat()."""
+    # The extra byte shows whether the file grew since the fstat()
+    data = os.read(fd, size + 1)
+    if len(data) <= size:
+        return data
+    chunks = [data]
+    while chunk := os.read(fd, 64 * 1024):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def read_note_bytes(path: Path, size: int | None = None) -> bytes:
+    """Read a note with one open, read and close, skipping the buffered file layer.
+
+    size is the note's size from an earlier stat; without it the file is fstat()ed.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return read_fd(fd, os.fstat(fd).st_size if size is None else size)
+    finally:
+        os.close(fd)
+
+
+def decode_note(raw: bytes) -> str:
+    """Decode note bytes the same way read_text() does, newline translation included."""
+    content = raw.decode("utf-8")
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+
+def write_atomic(path: Path, data: bytes, fsync: bool = False) -> None:
+    """Write data to path via a temp file and rename, so readers never see a partial file.
+
+    An existing file keeps its permissions; a new one gets the umask default, as with open().
+    """
+    try:
+        mode = path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
@@ -1,15 +1,36 @@
 """Vault scanner - builds index of all notes."""
 
+import hashlib
 import logging
+import os
 import re
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
 
 import yaml
 
+# Prefer the libyaml-backed C loader, bundled with most PyYAML wheels
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+from .noteio import decode_note, read_note_bytes, walk_md
+
 logger = logging.getLogger(__name__)
 
+_FRONTMATTER_RE = re.compile(r"^---\n(.*?)\n---", re.DOTALL)
+_FRONTMATTER_BLOCK_RE = re.compile(r"^---\n.*?\n---\n?", re.DOTALL)
+_H1_RE = re.compile(r"^#\s+(.+)$", re.MULTILINE)
+# Matches [[note]], [[note|alias]] and [[folder/note]]; group 1 is the target
+_WIKILINK_RE = re.compile(r"\[\[([^\]|]+)(?:\|[^\]]+)?\]\]")
+_INLINE_TAG_RE = re.compile(r"(?<!\S)#([a-zA-Z][a-zA-Z0-9_-]*)")
+# Markdown stripped from descriptions
+_MD_LINK_RE = re.compile(r"\[([^\]]+)\]\([^)]+\)")
+_EMPHASIS_RE = re.compile(r"[*_]{1,2}([^*_]+)[*_]{1,2}")
+
 
 @dataclass
 class NoteInfo:
@@ -21,6 +42,8 @@ class NoteInfo:
     tags: list[str] = field(default_factory=list)
     links: list[str] = field(default_factory=list)
     mtime: float = 0.0
+    size: int = 0  # bytes; with mtime, lets a rescan skip unchanged notes
+    content_hash: str | None = None  # lets a rescan recognise touched but unedited notes
     backlink_count: int = 0
     # LLM-enriched fields
     summary: str = ""
@@ -35,6 +58,8 @@ class NoteInfo:
             "tags": self.tags,
             "links": self.links,
             "mtime": self.mtime,
+            "size": self.size,
+            "content_hash": self.content_hash,
             "backlink_count": self.backlink_count,
             "summary": self.summary,
             "concepts": self.concepts,
@@ -43,18 +68,11 @@ class NoteInfo:
 
     @classmethod
     def from_dict(cls, data: dict) -> "NoteInfo":
-        return cls(
-            path=data["path"],
-            title=data["title"],
-            description=data["description"],
-            tags=data.get("tags", []),
-            links=data.get("links", []),
-            mtime=data.get("mtime", 0.0),
-            backlink_count=data.get("backlink_count", 0),
-            summary=data.get("summary", ""),
-            concepts=data.get("concepts", []),
-            summary_mtime=data.get("summary_mtime", 0.0),
-        )
+        try:
+            return cls(**data)
+        except TypeError:
+            # Keys this version doesn't know about; missing ones fall back to defaults
+            return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
 
     def needs_summary(self) -> bool:
         """Check if this note needs its summary regenerated."""
@@ -91,6 +109,13 @@ class VaultIndex:
     folders: list[FolderInfo] = field(default_factory=list)
     tags: dict[str, int] = field(default_factory=dict)
     notes: list[NoteInfo] = field(default_factory=list)
+    # Lowercased note name -> paths of notes linking to it (None for indexes saved without it)
+    backlinks: dict[str, list[str]] | None = None
+
+    @cached_property
+    def by_path(self) -> dict[str, NoteInfo]:
+        """Notes keyed by vault-relative path, built on first use."""
+        return {n.path: n for n in self.notes}
 
     def to_dict(self) -> dict:
         return {
@@ -100,6 +125,7 @@ class VaultIndex:
             "folders": [f.to_dict() for f in self.folders],
             "tags": self.tags,
             "notes": [n.to_dict() for n in self.notes],
+            "backlinks": self.backlinks,
         }
 
     @classmethod
@@ -111,21 +137,35 @@ class VaultIndex:
             folders=[FolderInfo.from_dict(f) for f in data.get("folders", [])],
             tags=data.get("tags", {}),
             notes=[NoteInfo.from_dict(n) for n in data.get("notes", [])],
+            backlinks=data.get("backlinks"),
         )
 
 
+def _content_hash(raw: bytes) -> str:
+    """Hash note bytes for change detection."""
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
 class VaultScanner:
     """Scans an Obsidian vault and builds an index."""
 
     def __init__(self, vault_path: Path) -> None:
         self.vault_path = vault_path
 
-    def scan(self, existing_notes: dict[str, NoteInfo] | None = None) -> VaultIndex:
+    def scan(
+        self, existing_notes: dict[str, NoteInfo] | None = None, parse_body: bool = True
+    ) -> VaultIndex:
         """Perform a full scan of the vault.
 
         Args:
             existing_notes: Optional dict of path -> NoteInfo from previous index.
-                           Used to preserve summaries for unchanged notes.
+                           Notes whose mtime and size are unchanged are reused
+                           without reading the file, and notes whose content hash
+                           is unchanged without parsing it; otherwise their
+                           summary is kept if the mtime still matches.
+            parse_body: If False, only frontmatter and title are extracted: notes get
+                        no inline tags, links or body description. Don't pass such
+                        notes back as existing_notes to a full scan.
         """
         logger.info(f"Scanning vault: {self.vault_path}")
         existing_notes = existing_notes or {}
@@ -133,23 +173,36 @@ class VaultScanner:
         notes: list[NoteInfo] = []
         folders: dict[str, FolderInfo] = {}
         tags: dict[str, int] = {}
-        link_targets: dict[str, int] = {}  # note name -> backlink count
-
-        # Scan all markdown files
-        for md_file in self.vault_path.rglob("*.md"):
-            # Skip hidden folders
-            if any(part.startswith(".") for part in md_file.parts):
-                continue
+        backlinks: dict[str, list[str]] = {}  # note name -> linking note paths
 
+        # Scan all markdown files, skipping hidden folders
+        for md_file, stat in walk_md(self.vault_path):
             try:
-                note_info = self._scan_note(md_file)
-
-                # Preserve summary from existing note if content hasn't changed
-                existing = existing_notes.get(note_info.path)
-                if existing and existing.mtime == note_info.mtime:
-                    note_info.summary = existing.summary
-                    note_info.concepts = existing.concepts
-                    note_info.summary_mtime = existing.summary_mtime
+                rel_path = str(md_file.relative_to(self.vault_path))
+                st = stat()
+                existing = existing_notes.get(rel_path)
+
+                if existing and existing.mtime == st.st_mtime and existing.size == st.st_size:
+                    # Unchanged since the last scan: reuse the parse, summary included
+                    note_info = replace(existing)
+                else:
+                    raw = read_note_bytes(md_file, st.st_size)
+                    # Partial parses get no hash, so a full scan never reuses them
+                    digest = _content_hash(raw) if parse_body else None
+                    if existing and digest is not None and existing.content_hash == digest:
+                        # Touched but not edited: keep the parse and a current summary
+                        note_info = replace(existing, mtime=st.st_mtime, size=st.st_size)
+                        if existing.summary and not existing.needs_summary():
+                            note_info.summary_mtime = max(existing.summary_mtime, st.st_mtime)
+                    else:
+                        note_info = self._scan_note(md_file, st, parse_body, raw)
+                        note_info.content_hash = digest
+
+                    # Preserve summary from existing note if content hasn't changed
+                    if existing and existing.mtime == note_info.mtime:
+                        note_info.summary = existing.summary
+                        note_info.concepts = existing.concepts
+                        note_info.summary_mtime = existing.summary_mtime
 
                 notes.append(note_info)
 
@@ -157,9 +210,9 @@ class VaultScanner:
                 for tag in note_info.tags:
                     tags[tag] = tags.get(tag, 0) + 1
 
-                # Count outgoing links for backlink calculation
+                # Record outgoing links for backlink lookups
                 for link in note_info.links:
-                    link_targets[link] = link_targets.get(link, 0) + 1
+                    backlinks.setdefault(link, []).append(note_info.path)
 
                 # Track folder
                 rel_folder = md_file.parent.relative_to(self.vault_path)
@@ -176,7 +229,7 @@ class VaultScanner:
         # Update backlink counts
         for note in notes:
             note_name = Path(note.path).stem.lower()
-            note.backlink_count = link_targets.get(note_name, 0)
+            note.backlink_count = len(backlinks.get(note_name, ()))
 
         # Build folder hierarchy
         folder_list = self._build_folder_hierarchy(folders)
@@ -188,16 +241,31 @@ class VaultScanner:
             folders=folder_list,
             tags=tags,
             notes=notes,
+            backlinks=backlinks,
         )
 
         logger.info(f"Indexed {len(notes)} notes, {len(tags)} tags, {len(folder_list)} folders")
         return index
 
-    def _scan_note(self, file_path: Path) -> NoteInfo:
-        """Extract information from a single note."""
-        content = file_path.read_text(encoding="utf-8")
+    def _scan_note(
+        self,
+        file_path: Path,
+        st: os.stat_result | None = None,
+        parse_body: bool = True,
+        raw: bytes | None = None,
+    ) -> NoteInfo:
+        """Extract information from a single note.
+
+        st is the file's stat taken before reading, so a write racing the scan
+        leaves a stale mtime and the note is re-read next time. raw is the
+        note's content if the caller already read it.
+        """
+        if st is None:
+            st = file_path.stat()
+        if raw is None:
+            raw = read_note_bytes(file_path, st.st_size)
+        content = decode_note(raw)
         rel_path = str(file_path.relative_to(self.vault_path))
-        mtime = file_path.stat().st_mtime
 
         # Parse frontmatter
         frontmatter = self._parse_frontmatter(content)
@@ -206,7 +274,7 @@ class VaultScanner:
         title = frontmatter.get("title", "")
         if not title:
             # Try first H1 heading
-            h1_match = re.search(r"^#\s+(.+)$", content, re.MULTILINE)
+            h1_match = _H1_RE.search(content)
             if h1_match:
                 title = h1_match.group(1).strip()
             else:
@@ -214,15 +282,15 @@ class VaultScanner:
 
         # Get description
         description = frontmatter.get("description", "")
-        if not description:
+        if not description and parse_body:
             # Use first non-empty, non-heading line
             description = self._extract_description(content)
 
         # Get tags from frontmatter and inline
-        tags = self._extract_tags(content, frontmatter)
+        tags = self._extract_tags(content if parse_body else "", frontmatter)
 
         # Get wikilinks
-        links = self._extract_links(content)
+        links = self._extract_links(content) if parse_body else []
 
         return NoteInfo(
             path=rel_path,
@@ -230,7 +298,8 @@ class VaultScanner:
             description=description[:100],  # Limit length
             tags=tags,
             links=links,
-            mtime=mtime,
+            mtime=st.st_mtime,
+            size=st.st_size,
         )
 
     def _parse_frontmatter(self, content: str) -> dict:
@@ -238,19 +307,19 @@ class VaultScanner:
         if not content.startswith("---"):
             return {}
 
-        match = re.match(r"^---\n(.*?)\n---", content, re.DOTALL)
+        match = _FRONTMATTER_RE.match(content)
         if not match:
             return {}
 
         try:
-            return yaml.safe_load(match.group(1)) or {}
+            return yaml.load(match.group(1), Loader=_Loader) or {}
         except yaml.YAMLError:
             return {}
 
     def _extract_description(self, content: str) -> str:
         """Extract a brief description from note content."""
         # Remove frontmatter
-        content = re.sub(r"^---\n.*?\n---\n?", "", content, flags=re.DOTALL)
+        content = _FRONTMATTER_BLOCK_RE.sub("", content, count=1)
 
         # Find first paragraph-like content
         for line in content.split("\n"):
@@ -265,9 +334,9 @@ class VaultScanner:
                 and not line.startswith(">")
             ):
                 # Clean up markdown
-                line = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", line)  # Links
-                line = re.sub(r"\[\[([^\]|]+)(\|[^\]]+)?\]\]", r"\1", line)  # Wikilinks
-                line = re.sub(r"[*_]{1,2}([^*_]+)[*_]{1,2}", r"\1", line)  # Bold/italic
+                line = _MD_LINK_RE.sub(r"\1", line)  # Links
+                line = _WIKILINK_RE.sub(r"\1", line)  # Wikilinks
+                line = _EMPHASIS_RE.sub(r"\1", line)  # Bold/italic
                 return line[:100]
 
         return ""
@@ -284,15 +353,14 @@ class VaultScanner:
             tags.add(fm_tags)
 
         # Inline tags (#tag)
-        inline_tags = re.findall(r"(?<!\S)#([a-zA-Z][a-zA-Z0-9_-]*)", content)
+        inline_tags = _INLINE_TAG_RE.findall(content)
         tags.update(inline_tags)
 
         return list(tags)
 
     def _extract_links(self, content: str) -> list[str]:
         """Extract wikilinks from content."""
-        # Match [[note]] or [[note|alias]] or [[folder/note]]
-        matches = re.findall(r"\[\[([^\]|]+)(?:\|[^\]]+)?\]\]", content)
+        matches = _WIKILINK_RE.findall(content)
 
         # Normalize: take just the note name (last part of path)
         links = []
@@ -1,5 +1,6 @@
 """Generate text summary of vault index for system prompt."""
 
+import heapq
 from datetime import datetime, timedelta
 
 from .scanner import NoteInfo, VaultIndex
@@ -98,26 +99,24 @@ def _select_priority_notes(notes: list[NoteInfo], max_count: int) -> list[NoteIn
         else:
             other.append(note)
 
-    # Sort each category
-    recent.sort(key=lambda n: -n.mtime)
-    hub_notes.sort(key=lambda n: -n.backlink_count)
-    other.sort(key=lambda n: n.title.lower())
-
-    # Combine with limits
+    # Combine with limits, only ordering as many notes of each category as are shown
+    # (nsmallest keeps sorted()'s order for ties)
     result = []
 
     # Recent notes first (up to 15)
-    result.extend(recent[: min(15, max_count)])
+    result.extend(heapq.nsmallest(min(15, max_count), recent, key=lambda n: -n.mtime))
 
     # Hub notes next (up to 10)
     remaining = max_count - len(result)
     if remaining > 0:
-        result.extend(hub_notes[: min(10, remaining)])
+        result.extend(
+            heapq.nsmallest(min(10, remaining), hub_notes, key=lambda n: -n.backlink_count)
+        )
 
     # Fill with other notes
     remaining = max_count - len(result)
     if remaining > 0:
-        result.extend(other[:remaining])
+        result.extend(heapq.nsmallest(remaining, other, key=lambda n: n.title.lower()))
 
     return result
 
@@ -44,12 +44,38 @@ class ImageProcessor(FileProcessor):
             return self._error_result("OpenAI client not configured")
 
         try:
-            # Read and encode image
             image_data = file_path.read_bytes()
+        except Exception as e:
+            logger.exception(f"Error processing image: {e}")
+            return self._error_result(str(e))
+
+        return self.process_bytes(image_data, filename or file_path.name, prompt=prompt)
+
+    def process_bytes(
+        self,
+        image_data: bytes,
+        filename: str = "",
+        prompt: str = "Describe this image in detail. If there's text, transcribe it.",
+    ) -> ProcessedContent:
+        """Process in-memory image data using OpenAI Vision API.
+
+        Args:
+            image_data: Raw image bytes
+            filename: Original filename (its suffix determines the media type)
+            prompt: Prompt for the vision model
+
+        Returns:
+            ProcessedContent with image description/transcription
+        """
+        if not self._client:
+            return self._error_result("OpenAI client not configured")
+
+        try:
+            # Encode image
             base64_image = base64.b64encode(image_data).decode("utf-8")
 
             # Determine media type
-            suffix = file_path.suffix.lower()
+            suffix = Path(filename).suffix.lower()
             media_types = {
                 ".png": "image/png",
                 ".jpg": "image/jpeg",
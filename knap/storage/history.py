@@ -1,15 +1,22 @@
 """Persistent conversation history storage."""
 
-import json
 import logging
 from pathlib import Path
 from typing import Any
 
+from knap.indexer.noteio import write_atomic
+
+from . import jsonio
+
 logger = logging.getLogger(__name__)
 
 
 class ConversationHistory:
-    """Persistent conversation history using JSON files."""
+    """Persistent conversation history using append-only JSON Lines files.
+
+    Each message is appended as one line. A file is only rewritten once it
+    holds twice max_messages lines, so adding a message costs one small write.
+    """
 
     def __init__(self, vault_path: Path, max_messages: int = 40) -> None:
         self.data_dir = vault_path / ".knap" / "conversations"
@@ -18,33 +25,78 @@ class ConversationHistory:
 
         # In-memory cache
         self._cache: dict[int, list[dict[str, Any]]] = {}
+        # Lines in each user's file, including ones trimmed from the cache
+        self._line_counts: dict[int, int] = {}
 
     def _get_file_path(self, user_id: int) -> Path:
         """Get the file path for a user's history."""
+        return self.data_dir / f"{user_id}.jsonl"
+
+    def _get_legacy_file_path(self, user_id: int) -> Path:
+        """Get the path of a history saved as a single JSON array."""
         return self.data_dir / f"{user_id}.json"
 
     def _load_from_disk(self, user_id: int) -> list[dict[str, Any]]:
         """Load history from disk."""
-        file_path = self._get_file_path(user_id)
-        if not file_path.exists():
+        try:
+            raw = self._get_file_path(user_id).read_bytes()
+        except FileNotFoundError:
+            return self._migrate_legacy(user_id)
+        except OSError as e:
+            logger.warning(f"Failed to load history for user {user_id}: {e}")
             return []
 
+        lines = raw.splitlines()
+        self._line_counts[user_id] = len(lines)
+        history = []
+        skipped = False
+        for line in lines[-self.max_messages :]:
+            try:
+                history.append(jsonio.loads(line))
+            except jsonio.JSONDecodeError:
+                # e.g. a line cut short by a crash mid-append
+                logger.warning(f"Skipping unreadable history line for user {user_id}")
+                skipped = True
+
+        # Appending after a torn last line would merge the next message into it
+        if skipped or (raw and not raw.endswith(b"\n")):
+            self._rewrite(user_id, history)
+        return history
+
+    def _migrate_legacy(self, user_id: int) -> list[dict[str, Any]]:
+        """Convert a JSON array history file, if any, to JSON Lines."""
+        legacy_path = self._get_legacy_file_path(user_id)
         try:
-            return json.loads(file_path.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError) as e:
+            history = jsonio.loads(legacy_path.read_bytes())[-self.max_messages :]
+        except FileNotFoundError:
+            return []
+        except (OSError, jsonio.JSONDecodeError) as e:
             logger.warning(f"Failed to load history for user {user_id}: {e}")
             return []
 
-    def _save_to_disk(self, user_id: int, history: list[dict[str, Any]]) -> None:
-        """Save history to disk."""
-        file_path = self._get_file_path(user_id)
+        self._rewrite(user_id, history)
+        legacy_path.unlink(missing_ok=True)
+        return history
+
+    def _append_to_disk(self, user_id: int, message: dict[str, Any]) -> None:
+        """Append one message to the user's history file."""
+        try:
+            with self._get_file_path(user_id).open("ab") as f:
+                f.write(jsonio.dumps(message) + b"\n")
+        except OSError as e:
+            logger.error(f"Failed to save history for user {user_id}: {e}")
+            return
+        self._line_counts[user_id] = self._line_counts.get(user_id, 0) + 1
+
+    def _rewrite(self, user_id: int, history: list[dict[str, Any]]) -> None:
+        """Replace the user's history file with exactly these messages."""
+        raw = b"".join(jsonio.dumps(m) + b"\n" for m in history)
         try:
-            file_path.write_text(
-                json.dumps(history, ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
+            write_atomic(self._get_file_path(user_id), raw)
         except OSError as e:
             logger.error(f"Failed to save history for user {user_id}: {e}")
+            return
+        self._line_counts[user_id] = len(history)
 
     def get(self, user_id: int) -> list[dict[str, Any]]:
         """Get conversation history for a user."""
@@ -61,11 +113,14 @@ class ConversationHistory:
         if len(history) > self.max_messages:
             history[:] = history[-self.max_messages :]
 
-        self._save_to_disk(user_id, history)
+        self._append_to_disk(user_id, message)
+        # Compact the file once trimmed messages make up half of it
+        if self._line_counts.get(user_id, 0) > 2 * self.max_messages:
+            self._rewrite(user_id, history)
 
     def clear(self, user_id: int) -> None:
         """Clear history for a user."""
         self._cache[user_id] = []
-        file_path = self._get_file_path(user_id)
-        if file_path.exists():
-            file_path.unlink()
+        self._line_counts[user_id] = 0
+        self._get_file_path(user_id).unlink(missing_ok=True)
+        self._get_legacy_file_path(user_id).unlink(missing_ok=True)
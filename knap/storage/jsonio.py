@@ -0,0 +1,35 @@
+"""JSON encoding for the state files in .knap/, using orjson when installed."""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson's decode error subclasses this, so callers catch one type either way
+JSONDecodeError = json.JSONDecodeError
+
+# Compact separators keep json.dumps on its C encoder; indent forces the Python one
+JSON_SEPARATORS = (",", ":")
+
+
+def dumps(data: Any, *, indent: bool = False) -> bytes:
+    """Encode data as UTF-8 JSON. Use indent for files users may edit by hand."""
+    if orjson is not None:
+        # Non-str keys (e.g. numeric YAML tags) are stringified, as json does
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, option=option)
+    if indent:
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+    else:
+        text = json.dumps(data, ensure_ascii=False, separators=JSON_SEPARATORS)
+    return text.encode("utf-8")
+
+
+def loads(raw: bytes) -> Any:
+    """Decode UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
@@ -1,11 +1,13 @@
 """Plan storage for multi-step operations."""
 
-import json
 import logging
 from datetime import UTC, datetime
 from pathlib import Path
 
 from knap.agent.planning import Plan, PlanStatus
+from knap.indexer.noteio import write_atomic
+
+from . import jsonio
 
 logger = logging.getLogger(__name__)
 
@@ -81,9 +83,9 @@ class PlanStorage:
             return
 
         try:
-            data = json.loads(self.plans_file.read_text(encoding="utf-8"))
+            data = jsonio.loads(self.plans_file.read_bytes())
             self._plans = {pid: Plan.from_dict(p) for pid, p in data.items()}
-        except (json.JSONDecodeError, OSError) as e:
+        except (jsonio.JSONDecodeError, OSError) as e:
             logger.warning(f"Failed to load plans: {e}")
             self._plans = {}
 
@@ -92,9 +94,6 @@ class PlanStorage:
         try:
             self.plans_file.parent.mkdir(parents=True, exist_ok=True)
             data = {pid: p.to_dict() for pid, p in self._plans.items()}
-            self.plans_file.write_text(
-                json.dumps(data, indent=2, ensure_ascii=False),
-                encoding="utf-8",
-            )
+            write_atomic(self.plans_file, jsonio.dumps(data, indent=True))
         except OSError as e:
             logger.error(f"Failed to save plans: {e}")
@@ -1,13 +1,16 @@
 """User settings and pending confirmation storage."""
 
-import json
 import logging
-import uuid
+import secrets
 from dataclasses import asdict, dataclass
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
+from knap.indexer.noteio import write_atomic
+
+from . import jsonio
+
 logger = logging.getLogger(__name__)
 
 
@@ -65,9 +68,9 @@ class SettingsStorage:
             return settings
 
         try:
-            data = json.loads(self.settings_file.read_text(encoding="utf-8"))
+            data = jsonio.loads(self.settings_file.read_bytes())
             return UserSettings.from_dict(data)
-        except (json.JSONDecodeError, OSError) as e:
+        except (jsonio.JSONDecodeError, OSError) as e:
             logger.warning(f"Failed to load settings, using defaults: {e}")
             return UserSettings()
 
@@ -75,10 +78,7 @@ class SettingsStorage:
         """Save settings to disk."""
         try:
             self.knap_dir.mkdir(parents=True, exist_ok=True)
-            self.settings_file.write_text(
-                json.dumps(settings.to_dict(), indent=2, ensure_ascii=False),
-                encoding="utf-8",
-            )
+            write_atomic(self.settings_file, jsonio.dumps(settings.to_dict(), indent=True))
         except OSError as e:
             logger.error(f"Failed to save settings: {e}")
 
@@ -116,6 +116,8 @@ class PendingConfirmationStorage:
         self.vault_path = vault_path
         self.pending_file = vault_path / ".knap" / "pending_confirmations.json"
         self._pending: dict[str, PendingConfirmation] = {}
+        # Same confirmations keyed by user, in creation order
+        self._by_user: dict[int, dict[str, PendingConfirmation]] = {}
         self._load()
 
     def create(
@@ -127,14 +129,14 @@ class PendingConfirmationStorage:
     ) -> PendingConfirmation:
         """Create a new pending confirmation."""
         confirmation = PendingConfirmation(
-            confirmation_id=str(uuid.uuid4())[:8],
+            confirmation_id=secrets.token_hex(4),
             user_id=user_id,
             tool_name=tool_name,
             tool_args=tool_args,
             message=message,
             created_at=datetime.now(UTC).isoformat(),
         )
-        self._pending[confirmation.confirmation_id] = confirmation
+        self._add(confirmation)
         self._save()
         return confirmation
 
@@ -146,42 +148,53 @@ class PendingConfirmationStorage:
         """Remove and return a pending confirmation."""
         confirmation = self._pending.pop(confirmation_id, None)
         if confirmation:
+            self._discard(confirmation)
             self._save()
         return confirmation
 
     def get_for_user(self, user_id: int) -> list[PendingConfirmation]:
         """Get all pending confirmations for a user."""
-        return [c for c in self._pending.values() if c.user_id == user_id]
+        return list(self._by_user.get(user_id, {}).values())
 
     def cleanup_expired(self, timeout_minutes: int) -> int:
         """Remove expired confirmations. Returns count removed."""
         expired = [cid for cid, c in self._pending.items() if c.is_expired(timeout_minutes)]
         for cid in expired:
-            del self._pending[cid]
+            self._discard(self._pending.pop(cid))
         if expired:
             self._save()
         return len(expired)
 
+    def _add(self, confirmation: PendingConfirmation) -> None:
+        """Index a confirmation by ID and by user."""
+        cid = confirmation.confirmation_id
+        self._pending[cid] = confirmation
+        self._by_user.setdefault(confirmation.user_id, {})[cid] = confirmation
+
+    def _discard(self, confirmation: PendingConfirmation) -> None:
+        """Drop a confirmation already popped from _pending from the per-user index."""
+        user_pending = self._by_user.get(confirmation.user_id, {})
+        user_pending.pop(confirmation.confirmation_id, None)
+        if not user_pending:
+            self._by_user.pop(confirmation.user_id, None)
+
     def _load(self) -> None:
         """Load pending confirmations from disk."""
-        if not self.pending_file.exists():
-            return
-
         try:
-            data = json.loads(self.pending_file.read_text(encoding="utf-8"))
-            self._pending = {cid: PendingConfirmation.from_dict(c) for cid, c in data.items()}
-        except (json.JSONDecodeError, OSError) as e:
+            data = jsonio.loads(self.pending_file.read_bytes())
+        except FileNotFoundError:
+            return
+        except (jsonio.JSONDecodeError, OSError) as e:
             logger.warning(f"Failed to load pending confirmations: {e}")
-            self._pending = {}
+            return
+        for c in data.values():
+            self._add(PendingConfirmation.from_dict(c))
 
     def _save(self) -> None:
         """Save pending confirmations to disk."""
         try:
             self.pending_file.parent.mkdir(parents=True, exist_ok=True)
             data = {cid: c.to_dict() for cid, c in self._pending.items()}
-            self.pending_file.write_text(
-                json.dumps(data, indent=2, ensure_ascii=False),
-                encoding="utf-8",
-            )
+            write_atomic(self.pending_file, jsonio.dumps(data))
         except OSError as e:
             logger.error(f"Failed to save pending confirmations: {e}")
@@ -1,15 +1,17 @@
 """Persistent storage for vault index."""
 
-import json
 import logging
 from datetime import datetime
 from pathlib import Path
 
 from openai import OpenAI
 
+from knap.indexer.noteio import walk_md, write_atomic
 from knap.indexer.scanner import NoteInfo, VaultIndex, VaultScanner
 from knap.indexer.summarizer import NoteSummarizer
 
+from . import jsonio
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,7 +42,11 @@ class VaultIndexStorage:
     def get_index(self) -> VaultIndex:
         """Get the current index, loading or building as needed."""
         if self._index is None:
-            self._index = self._load_or_build()
+            self._index = self._load()
+            if self._index is None:
+                # A freshly built index is current; skip the vault walk below
+                self._index = self._rebuild()
+                return self._index
 
         # Check if refresh needed
         if self._needs_refresh():
@@ -49,6 +55,10 @@ class VaultIndexStorage:
 
         return self._index
 
+    def get_cached_index(self) -> VaultIndex | None:
+        """Get the in-memory index without loading or refreshing it."""
+        return self._index
+
     def rebuild(self) -> VaultIndex:
         """Force a full rebuild of the index."""
         self._index = self._rebuild()
@@ -72,12 +82,9 @@ class VaultIndexStorage:
 
         # Check a sample of files for performance
         count = 0
-        for md_file in self.vault_path.rglob("*.md"):
-            if any(part.startswith(".") for part in md_file.parts):
-                continue
-
+        for _, stat in walk_md(self.vault_path):
             try:
-                mtime = md_file.stat().st_mtime
+                mtime = stat().st_mtime
                 if mtime > latest_mtime:
                     latest_mtime = mtime
             except Exception:
@@ -98,25 +105,30 @@ class VaultIndexStorage:
 
         return latest_mtime
 
+    def _load(self) -> VaultIndex | None:
+        """Load index from disk, or None if it is missing or unreadable."""
+        try:
+            data = jsonio.loads(self.index_file.read_bytes())
+            index = VaultIndex.from_dict(data)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to load index, rebuilding: {e}")
+            return None
+
+        logger.info(f"Loaded vault index ({index.total_notes} notes)")
+        return index
+
     def _load_or_build(self) -> VaultIndex:
         """Load index from disk or build if not available."""
-        if self.index_file.exists():
-            try:
-                data = json.loads(self.index_file.read_text(encoding="utf-8"))
-                index = VaultIndex.from_dict(data)
-                logger.info(f"Loaded vault index ({index.total_notes} notes)")
-                return index
-            except Exception as e:
-                logger.warning(f"Failed to load index, rebuilding: {e}")
-
-        return self._rebuild()
+        return self._load() or self._rebuild()
 
     def _rebuild(self) -> VaultIndex:
         """Build a new index and save to disk."""
         # Get existing notes to preserve summaries for unchanged notes
         existing_notes: dict[str, NoteInfo] = {}
         if self._index:
-            existing_notes = {n.path: n for n in self._index.notes}
+            existing_notes = self._index.by_path
 
         index = self.scanner.scan(existing_notes)
 
@@ -204,10 +216,7 @@ class VaultIndexStorage:
         """Save index to disk (inside vault/.knap/)."""
         try:
             self.knap_dir.mkdir(parents=True, exist_ok=True)
-            self.index_file.write_text(
-                json.dumps(index.to_dict(), ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
+            write_atomic(self.index_file, jsonio.dumps(index.to_dict()))
             logger.info(f"Saved vault index to {self.index_file}")
         except Exception as e:
             logger.error(f"Failed to save index: {e}")
@@ -1,8 +1,10 @@
 """Telegram bot setup and initialization."""
 
+import asyncio
 import html
 import logging
 import tempfile
+from itertools import chain
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -11,7 +13,7 @@ from telegram.ext import Application, CallbackQueryHandler, CommandHandler, Mess
 
 from knap.agent import AgentResponse, ProgressUpdate
 from knap.agent.core import Colors
-from knap.agent.planning import Plan
+from knap.agent.planning import Plan, PlanStep
 from knap.config import Settings
 from knap.processors import get_processor
 from knap.processors.image_processor import ImageProcessor
@@ -22,6 +24,12 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Files up to this size are downloaded into memory instead of a temp file
+MAX_IN_MEMORY_DOWNLOAD = 5 * 1024 * 1024
+
+# Telegram rejects buttons whose callback_data is longer than this many bytes
+MAX_CALLBACK_DATA = 64
+
 
 def _format_confirmation_html(confirmation: PendingConfirmation) -> str:
     """Format a confirmation message with HTML for Telegram."""
@@ -76,40 +84,48 @@ def _format_confirmation_html(confirmation: PendingConfirmation) -> str:
         else:
             return f"⏳ {html.escape(str(confirmation.message))}"
     except Exception as e:
-        logger.exception(f"Error formatting confirmation HTML: {e}")
+        logger.exception("Error formatting confirmation HTML: %s", e)
         return f"⏳ {html.escape(str(confirmation.message))}"
 
 
-def _format_plan_html(plan: Plan, max_length: int = 3500) -> str:
-    """Format a plan for Telegram display using HTML."""
-    lines = [f"📋 <b>{html.escape(plan.title)}</b>", ""]
+_STEP_ICONS = {"completed": "✅", "in_progress": "⏳", "failed": "❌"}
 
-    if plan.description:
-        lines.append(html.escape(plan.description[:200]))
-        lines.append("")
 
-    lines.append("<b>Steps:</b>")
-    for step in plan.steps:
-        if step.status.value == "completed":
-            icon = "✅"
-        elif step.status.value == "in_progress":
-            icon = "⏳"
-        elif step.status.value == "failed":
-            icon = "❌"
-        else:
-            icon = "⬜"
+def _fmt_step(step: PlanStep) -> str:
+    """Format a single plan step line."""
+    icon = _STEP_ICONS.get(step.status.value, "⬜")
+    tool_info = f" <code>{step.tool_name}</code>" if step.tool_name else ""
+    return f"{icon} {step.step_number}. {html.escape(step.description[:80])}{tool_info}"
 
-        step_text = html.escape(step.description[:80])
-        tool_info = f" <code>{step.tool_name}</code>" if step.tool_name else ""
-        lines.append(f"{icon} {step.step_number}. {step_text}{tool_info}")
 
-    text = "\n".join(lines)
+# Ends a plan message cut short to fit
+_TRUNCATED = "<i>... (truncated)</i>"
 
-    # Truncate if too long
-    if len(text) > max_length:
-        text = text[: max_length - 20] + "\n\n<i>... (truncated)</i>"
 
-    return text
+def _format_plan_html(plan: Plan, max_length: int = 3500) -> str:
+    """Format a plan for Telegram display using HTML."""
+    header = [f"📋 <b>{html.escape(plan.title)}</b>", ""]
+    if plan.description:
+        header += [html.escape(plan.description[:200]), ""]
+    header.append("<b>Steps:</b>")
+
+    # Stop formatting steps once the text is too long instead of slicing afterwards.
+    # The title is always kept; when truncating, lines are dropped back to the last
+    # one that leaves room for a blank line and the marker.
+    budget = max_length - len("\n\n" + _TRUNCATED)
+    title, *rest = header
+    parts = [title]
+    size = len(title)
+    cut = None
+    for line in chain(rest, map(_fmt_step, plan.steps)):
+        size += len(line) + 1
+        if size > max_length:
+            return "\n".join([*parts[:cut], "", _TRUNCATED])
+        if cut is None and size > budget:
+            cut = len(parts)
+        parts.append(line)
+
+    return "\n".join(parts)
 
 
 def _format_progress_html(update: ProgressUpdate) -> str:
@@ -165,7 +181,7 @@ def _format_progress_html(update: ProgressUpdate) -> str:
 async def _post_init(application) -> None:
     """Called after bot is initialized."""
     bot_info = await application.bot.get_me()
-    logger.info(f"{Colors.GREEN}Connected as @{bot_info.username}{Colors.RESET}")
+    logger.info("%sConnected as @%s%s", Colors.GREEN, bot_info.username, Colors.RESET)
 
 
 class TelegramBot:
@@ -207,14 +223,16 @@ class TelegramBot:
 
     async def _handle_start(self, update: Update, context) -> None:
         """Handle /start command."""
-        if not update.effective_user or not update.message:
+        user = update.effective_user
+        msg = update.message
+        if not user or not msg:
             return
 
-        if not self._is_authorized(update.effective_user.id):
-            await update.message.reply_text("Unauthorized. Access denied.")
+        if not self._is_authorized(user.id):
+            await msg.reply_text("Unauthorized. Access denied.")
             return
 
-        await update.message.reply_text(
+        await msg.reply_text(
             "Welcome to Knap! I'm your Obsidian assistant.\n\n"
             "Send me a message to interact with your vault.\n"
             "Use /help for available commands."
@@ -222,13 +240,15 @@ class TelegramBot:
 
     async def _handle_help(self, update: Update, context) -> None:
         """Handle /help command."""
-        if not update.effective_user or not update.message:
+        user = update.effective_user
+        msg = update.message
+        if not user or not msg:
             return
 
-        if not self._is_authorized(update.effective_user.id):
+        if not self._is_authorized(user.id):
             return
 
-        await update.message.reply_text(
+        await msg.reply_text(
             "*Available Commands*\n\n"
             "/start - Start the bot\n"
             "/help - Show this help message\n"
@@ -245,29 +265,33 @@ class TelegramBot:
 
     async def _handle_clear(self, update: Update, context) -> None:
         """Handle /clear command - reset conversation history."""
-        if not update.effective_user or not update.message:
+        user = update.effective_user
+        msg = update.message
+        if not user or not msg:
             return
 
-        if not self._is_authorized(update.effective_user.id):
+        if not self._is_authorized(user.id):
             return
 
-        user_id = update.effective_user.id
+        user_id = user.id
         self.agent.clear_history(user_id)
-        await update.message.reply_text("Conversation history cleared.")
+        await msg.reply_text("Conversation history cleared.")
 
     async def _handle_message(self, update: Update, context) -> None:
         """Handle regular text messages."""
-        if not update.effective_user or not update.message or not update.message.text:
+        user = update.effective_user
+        msg = update.message
+        if not user or not msg or not msg.text:
             return
 
-        user_id = update.effective_user.id
+        user_id = user.id
 
         if not self._is_authorized(user_id):
-            await update.message.reply_text("Unauthorized. Access denied.")
+            await msg.reply_text("Unauthorized. Access denied.")
             return
 
         # Send initial progress message
-        progress_message = await update.message.reply_text(
+        progress_message = await msg.reply_text(
             "⏳ Processing...",
             parse_mode="HTML",
         )
@@ -289,12 +313,10 @@ class TelegramBot:
                     await progress_message.edit_text(new_content, parse_mode="HTML")
                     last_content = new_content
             except Exception as e:
-                logger.debug(f"Failed to update progress message: {e}")
+                logger.debug("Failed to update progress message: %s", e)
 
         def progress_callback(progress: ProgressUpdate) -> None:
             """Sync callback that schedules async update."""
-            import asyncio
-
             try:
                 loop = asyncio.get_running_loop()
                 loop.create_task(update_progress(progress))
@@ -302,9 +324,7 @@ class TelegramBot:
                 pass  # No running loop, skip update
 
         try:
-            response = await self.agent.process_message(
-                user_id, update.message.text, progress_callback
-            )
+            response = await self.agent.process_message(user_id, msg.text, progress_callback)
 
             # Delete progress message and send final response
             try:
@@ -318,78 +338,86 @@ class TelegramBot:
             try:
                 await progress_message.edit_text(f"❌ Error: {e}")
             except Exception:
-                await update.message.reply_text(f"Error: {e}")
+                await msg.reply_text(f"Error: {e}")
 
     async def _handle_voice(self, update: Update, context) -> None:
         """Handle voice messages - transcribe and process."""
-        if not update.effective_user or not update.message or not update.message.voice:
+        user = update.effective_user
+        msg = update.message
+        if not user or not msg or not msg.voice:
             return
 
-        user_id = update.effective_user.id
+        user_id = user.id
 
         if not self._is_authorized(user_id):
-            await update.message.reply_text("Unauthorized. Access denied.")
+            await msg.reply_text("Unauthorized. Access denied.")
             return
 
+        voice = msg.voice
+
         # Show typing indicator while processing
-        await update.message.chat.send_action("typing")
+        await msg.chat.send_action("typing")
 
         try:
             # Download voice file
-            voice = update.message.voice
             file = await context.bot.get_file(voice.file_id)
 
-            # Save to temp file
-            with tempfile.NamedTemporaryFile(suffix=".ogg", delete=False) as tmp:
-                await file.download_to_drive(tmp.name)
-                tmp_path = Path(tmp.name)
-
-            try:
-                # Transcribe with Whisper
-                transcription = await self.agent.transcribe_audio(tmp_path)
-
-                if not transcription:
-                    await update.message.reply_text("Could not transcribe audio.")
-                    return
+            if voice.file_size and voice.file_size <= MAX_IN_MEMORY_DOWNLOAD:
+                # Small voice notes: keep in memory, skip the temp file round-trip
+                audio = bytes(await file.download_as_bytearray())
+                transcription = await self.agent.transcribe_audio(audio, "voice.ogg")
+            else:
+                with tempfile.NamedTemporaryFile(suffix=".ogg", delete=False) as tmp:
+                    await file.download_to_drive(tmp.name)
+                    tmp_path = Path(tmp.name)
 
-                # Process transcribed text
-                response = await self.agent.process_message(user_id, transcription)
-                await self._send_response(update, response)
+                try:
+                    # Transcribe with Whisper
+                    transcription = await self.agent.transcribe_audio(tmp_path)
+                finally:
+                    # Clean up temp file
+                    tmp_path.unlink(missing_ok=True)
+
+            if not transcription:
+                await msg.reply_text("Could not transcribe audio.")
+                return
 
-            finally:
-                # Clean up temp file
-                tmp_path.unlink(missing_ok=True)
+            # Process transcribed text
+            response = await self.agent.process_message(user_id, transcription)
+            await self._send_response(update, response)
 
         except Exception as e:
             logger.exception("Error processing voice message")
-            await update.message.reply_text(f"Error: {e}")
+            await msg.reply_text(f"Error: {e}")
 
     async def _handle_document(self, update: Update, context) -> None:
         """Handle document messages (PDF, CSV, etc.)."""
-        if not update.effective_user or not update.message or not update.message.document:
+        user = update.effective_user
+        msg = update.message
+        if not user or not msg or not msg.document:
             return
 
-        user_id = update.effective_user.id
+        user_id = user.id
 
         if not self._is_authorized(user_id):
-            await update.message.reply_text("Unauthorized. Access denied.")
+            await msg.reply_text("Unauthorized. Access denied.")
             return
 
-        document = update.message.document
+        document = msg.document
         filename = document.file_name or "document"
         mime_type = document.mime_type or ""
 
         # Get appropriate processor
         processor = get_processor(mime_type, filename)
         if not processor:
-            await update.message.reply_text(
+            await msg.reply_text(
                 f"Unsupported file type: {mime_type or filename}\n"
                 "Supported: CSV, PDF, images (PNG, JPG, GIF, WebP)"
             )
             return
 
         # Send processing indicator
-        progress_message = await update.message.reply_text(
+        progress_message = await msg.reply_text(
             f"⏳ Processing {filename}...",
             parse_mode="HTML",
         )
@@ -412,7 +440,7 @@ class TelegramBot:
                     return
 
                 # Get caption as user instruction (if any)
-                caption = update.message.caption or ""
+                caption = msg.caption or ""
                 user_message = (
                     f"{caption}\n\n[Attached file: {filename}]\n{result.text}"
                     if caption
@@ -433,24 +461,26 @@ class TelegramBot:
             try:
                 await progress_message.edit_text(f"❌ Error: {e}")
             except Exception:
-                await update.message.reply_text(f"Error: {e}")
+                await msg.reply_text(f"Error: {e}")
 
     async def _handle_photo(self, update: Update, context) -> None:
         """Handle photo messages using Vision API."""
-        if not update.effective_user or not update.message or not update.message.photo:
+        user = update.effective_user
+        msg = update.message
+        if not user or not msg or not msg.photo:
             return
 
-        user_id = update.effective_user.id
+        user_id = user.id
 
         if not self._is_authorized(user_id):
-            await update.message.reply_text("Unauthorized. Access denied.")
+            await msg.reply_text("Unauthorized. Access denied.")
             return
 
         # Get the largest photo
-        photo = update.message.photo[-1]
+        photo = msg.photo[-1]
 
         # Send processing indicator
-        progress_message = await update.message.reply_text(
+        progress_message = await msg.reply_text(
             "⏳ Analyzing image...",
             parse_mode="HTML",
         )
@@ -459,55 +489,60 @@ class TelegramBot:
             # Download photo
             file = await context.bot.get_file(photo.file_id)
 
-            with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp:
-                await file.download_to_drive(tmp.name)
-                tmp_path = Path(tmp.name)
-
-            try:
-                # Process with Vision API
-                processor = ImageProcessor(self.agent.client)
+            # Process with Vision API
+            processor = ImageProcessor(self.agent.client)
 
-                # Use caption as custom prompt if provided
-                caption = update.message.caption or ""
-                prompt = (
-                    caption
-                    if caption
-                    else "Describe this image in detail. If there's text, transcribe it."
-                )
+            # Use caption as custom prompt if provided
+            caption = msg.caption or ""
+            prompt = (
+                caption
+                if caption
+                else "Describe this image in detail. If there's text, transcribe it."
+            )
 
-                result = processor.process(tmp_path, "photo.jpg", prompt=prompt)
+            if photo.file_size and photo.file_size <= MAX_IN_MEMORY_DOWNLOAD:
+                image_data = bytes(await file.download_as_bytearray())
+                result = processor.process_bytes(image_data, "photo.jpg", prompt=prompt)
+            else:
+                with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp:
+                    await file.download_to_drive(tmp.name)
+                    tmp_path = Path(tmp.name)
 
-                if not result.success:
-                    await progress_message.edit_text(f"❌ Error: {result.error}")
-                    return
+                try:
+                    result = processor.process(tmp_path, "photo.jpg", prompt=prompt)
+                finally:
+                    tmp_path.unlink(missing_ok=True)
 
-                # Build message for agent
-                user_message = f"[Image analysis]\n{result.text}"
-                if caption:
-                    user_message = f"{caption}\n\n{user_message}"
+            if not result.success:
+                await progress_message.edit_text(f"❌ Error: {result.error}")
+                return
 
-                # Delete progress message
-                await progress_message.delete()
+            # Build message for agent
+            user_message = f"[Image analysis]\n{result.text}"
+            if caption:
+                user_message = f"{caption}\n\n{user_message}"
 
-                # Process with agent
-                await self._handle_message_with_content(update, context, user_id, user_message)
+            # Delete progress message
+            await progress_message.delete()
 
-            finally:
-                tmp_path.unlink(missing_ok=True)
+            # Process with agent
+            await self._handle_message_with_content(update, context, user_id, user_message)
 
         except Exception as e:
             logger.exception("Error processing photo")
             try:
                 await progress_message.edit_text(f"❌ Error: {e}")
             except Exception:
-                await update.message.reply_text(f"Error: {e}")
+                await msg.reply_text(f"Error: {e}")
 
     async def _handle_message_with_content(
         self, update: Update, context, user_id: int, content: str
     ) -> None:
         """Process a message with pre-extracted content."""
+        msg = update.message
+
         # Send progress message
-        progress_message = await update.message.reply_text(
+        progress_message = await msg.reply_text(
             "⏳ Processing...",
             parse_mode="HTML",
         )
@@ -524,11 +559,9 @@ class TelegramBot:
                     await progress_message.edit_text(new_content, parse_mode="HTML")
                     last_content = new_content
             except Exception as e:
-                logger.debug(f"Failed to update progress: {e}")
+                logger.debug("Failed to update progress: %s", e)
 
         def progress_callback(progress: ProgressUpdate) -> None:
-            import asyncio
-
             try:
                 loop = asyncio.get_running_loop()
                 loop.create_task(update_progress(progress))
@@ -549,7 +582,7 @@ class TelegramBot:
             try:
                 await progress_message.edit_text(f"❌ Error: {e}")
             except Exception:
-                await update.message.reply_text(f"Error: {e}")
+                await msg.reply_text(f"Error: {e}")
 
     async def _handle_callback(self, update: Update, context) -> None:
         """Handle callback queries from confirmation buttons."""
@@ -658,11 +691,12 @@ class TelegramBot:
         # Send confirmation buttons for each pending action
         confirmations = response.pending_confirmations
         if confirmations:
-            logger.info(f"Sending {len(confirmations)} confirmation button(s)")
+            logger.info("Sending %d confirmation button(s)", len(confirmations))
 
-        # If multiple confirmations, show "Confirm All" option first
-        if len(confirmations) > 1:
-            all_ids = ",".join(c.confirmation_id for c in confirmations)
+        # If multiple confirmations, show "Confirm All" option first, as long as
+        # every ID fits in the button's callback_data (8-character IDs allow five)
+        all_ids = ",".join(c.confirmation_id for c in confirmations)
+        if len(confirmations) > 1 and len(f"confirm_all:{all_ids}") <= MAX_CALLBACK_DATA:
             keyboard = [
                 [
                     InlineKeyboardButton(
@@ -696,7 +730,7 @@ class TelegramBot:
                     parse_mode="HTML",
                 )
             except Exception as e:
-                logger.exception(f"Failed to send confirmation button: {e}")
+                logger.exception("Failed to send confirmation button: %s", e)
                 # Fallback to plain text
                 await update.message.reply_text(
                     f"⏳ {confirmation.message}",
@@ -3,6 +3,7 @@
 from collections.abc import Callable
 from pathlib import Path
 
+from knap.indexer import VaultIndex
 from knap.storage import SettingsStorage
 
 from .base import Tool, ToolRegistry, ToolResult
@@ -31,6 +32,7 @@ def create_tool_registry(
     settings_storage: SettingsStorage,
     refresh_callback: Callable[[], None] | None = None,
     task_update_callback: Callable | None = None,
+    index_provider: Callable[[], VaultIndex | None] | None = None,
 ) -> ToolRegistry:
     """Create a registry with all available tools."""
     registry = ToolRegistry()
@@ -50,7 +52,10 @@ def create_tool_registry(
 
     # Navigation tools
     registry.register(ListFolderTool(vault_path))
-    registry.register(GetBacklinksTool(vault_path))
+    backlinks_tool = GetBacklinksTool(vault_path)
+    if index_provider:
+        backlinks_tool.set_index_provider(index_provider)
+    registry.register(backlinks_tool)
 
     # Frontmatter tools
     registry.register(GetFrontmatterTool(vault_path))
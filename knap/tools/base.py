@@ -1,10 +1,13 @@
 """Base tool class and registry for vault operations."""
 
+import os
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+from knap.indexer.noteio import write_atomic
+
 
 @dataclass
 class ToolResult:
@@ -36,6 +39,19 @@ class Tool(ABC):
         if path.startswith("/"):
             path = path[1:]
 
+        # Fast path: a lexically contained path with no symlinks below the vault root
+        # can't escape it, so skip resolving every component up from the filesystem root
+        normalized = os.path.normpath(path)
+        if not os.path.isabs(normalized) and normalized.split(os.sep, 1)[0] != "..":
+            # Plain string joins; building a Path per component costs more than the lstat
+            current = os.fspath(self.vault_path)
+            for part in normalized.split(os.sep):
+                current = os.path.join(current, part)
+                if os.path.islink(current):
+                    break
+            else:
+                return self.vault_path / normalized
+
         full_path = (self.vault_path / path).resolve()
 
         # Security check: ensure path is within vault
@@ -52,6 +68,10 @@ class Tool(ABC):
             return path + ".md"
         return path
 
+    def _write_atomic(self, path: Path, content: str, fsync: bool = False) -> None:
+        """Write content to path via a temp file and rename, so readers never see a partial note."""
+        write_atomic(path, content.encode("utf-8"), fsync=fsync)
+
     @abstractmethod
     def execute(self, **kwargs) -> ToolResult:
         """Execute the tool with given parameters."""
@@ -74,10 +94,12 @@ class ToolRegistry:
     """Registry of available tools."""
 
     tools: dict[str, Tool] = field(default_factory=dict)
+    _openai_tools: list[dict] | None = field(default=None, init=False, repr=False)
 
     def register(self, tool: Tool) -> None:
         """Register a tool."""
         self.tools[tool.name] = tool
+        self._openai_tools = None
 
     def get(self, name: str) -> Tool | None:
         """Get a tool by name."""
@@ -103,4 +125,7 @@ class ToolRegistry:
 
     def get_openai_tools(self) -> list[dict]:
         """Get all tools in OpenAI function calling format."""
-        return [tool.to_openai_function() for tool in self.tools.values()]
+        # Built once and reused every agent turn until another tool is registered
+        if self._openai_tools is None:
+            self._openai_tools = [tool.to_openai_function() for tool in self.tools.values()]
+        return self._openai_tools
@@ -3,6 +3,8 @@
 from datetime import datetime
 
 from .base import Tool, ToolResult
+from .frontmatter import invalidate_frontmatter_cache
+from .read import invalidate_note_caches
 
 
 class GetDailyNoteTool(Tool):
@@ -62,7 +64,9 @@ tags: [daily]
 ## Notes
 
 """
-            full_path.write_text(template, encoding="utf-8")
+            self._write_atomic(full_path, template)
+            invalidate_note_caches(full_path)
+            invalidate_frontmatter_cache(full_path)
             created = True
 
         content = full_path.read_text(encoding="utf-8")
@@ -1,6 +1,8 @@
 """Surgical edit tool for notes - exact string replacement."""
 
 from .base import Tool, ToolResult
+from .frontmatter import invalidate_frontmatter_cache
+from .read import invalidate_note_caches
 
 
 class EditNoteTool(Tool):
@@ -67,10 +69,18 @@ class EditNoteTool(Tool):
                 message="old_string and new_string must be different",
             )
 
+        if not old_string:
+            return ToolResult(
+                success=False,
+                data=None,
+                message="old_string must not be empty",
+            )
+
         content = full_path.read_text(encoding="utf-8")
 
-        # Count occurrences
-        occurrence_count = content.count(old_string)
+        # Split once: gives both the occurrence count and the pieces to rejoin
+        parts = content.split(old_string)
+        occurrence_count = len(parts) - 1
 
         if occurrence_count == 0:
             return ToolResult(
@@ -89,15 +99,14 @@ class EditNoteTool(Tool):
                 ),
             )
 
-        # Perform replacement
-        if replace_all:
-            new_content = content.replace(old_string, new_string)
-            replaced_count = occurrence_count
-        else:
-            new_content = content.replace(old_string, new_string, 1)
-            replaced_count = 1
+        # Perform replacement (a single match is the only case left without replace_all)
+        new_content = new_string.join(parts)
+        replaced_count = occurrence_count
 
-        full_path.write_text(new_content, encoding="utf-8")
+        self._write_atomic(full_path, new_content)
+        # Inodes get reused, so don't rely on the new one alone to show the change
+        invalidate_note_caches(full_path)
+        invalidate_frontmatter_cache(full_path)
 
         # Create a short preview of what changed
         old_preview = old_string[:50] + "..." if len(old_string) > 50 else old_string
@@ -1,11 +1,25 @@
 """Tools for working with YAML frontmatter."""
 
+import copy
 import re
+from pathlib import Path
 from typing import Any
 
 import yaml
 
 from .base import Tool, ToolResult
+from .read import invalidate_note_caches
+
+# Prefer the libyaml-backed C loader/dumper, bundled with most PyYAML wheels
+try:
+    from yaml import CSafeDumper as _Dumper
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeDumper as _Dumper
+    from yaml import SafeLoader as _Loader
+
+_FM_RE = re.compile(r"^---\n(.*?)\n---\n?(.*)", re.DOTALL)
+_FM_PREFIX = b"---"
 
 
 def parse_frontmatter(content: str) -> tuple[dict[str, Any], str]:
@@ -17,24 +31,64 @@ def parse_frontmatter(content: str) -> tuple[dict[str, Any], str]:
         return {}, content
 
     # Find the closing ---
-    match = re.match(r"^---\n(.*?)\n---\n?(.*)", content, re.DOTALL)
+    match = _FM_RE.match(content)
     if not match:
         return {}, content
 
     try:
-        frontmatter = yaml.safe_load(match.group(1)) or {}
+        frontmatter = yaml.load(match.group(1), Loader=_Loader) or {}
         body = match.group(2)
         return frontmatter, body
     except yaml.YAMLError:
         return {}, content
 
 
+# Parsed frontmatter per note path: (mtime_ns, size, frontmatter, body offset)
+_FM_CACHE: dict[str, tuple[int, int, dict[str, Any], int]] = {}
+FM_CACHE_MAX = 4096
+
+
+def parse_frontmatter_cached(path: Path, content: str | None = None) -> tuple[dict[str, Any], int]:
+    """Parse frontmatter from a note file, reusing the last parse while it is unchanged.
+
+    Returns (frontmatter_dict, body_offset). The file is only read on a cache miss
+    unless its content is passed in.
+    """
+    key = str(path)
+    st = path.stat()
+    cached = _FM_CACHE.get(key)
+
+    if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+        _, _, frontmatter, offset = cached
+    else:
+        if content is None:
+            # Most notes have no frontmatter; peek before decoding the whole file
+            with open(path, "rb") as f:
+                has_frontmatter = f.read(len(_FM_PREFIX)) == _FM_PREFIX
+            content = path.read_text(encoding="utf-8") if has_frontmatter else ""
+        frontmatter, body = parse_frontmatter(content)
+        offset = len(content) - len(body)
+
+        _FM_CACHE.pop(key, None)
+        if len(_FM_CACHE) >= FM_CACHE_MAX:
+            del _FM_CACHE[next(iter(_FM_CACHE))]
+        _FM_CACHE[key] = (st.st_mtime_ns, st.st_size, frontmatter, offset)
+
+    # Callers may mutate the result, so never hand out the cached dict itself
+    return copy.deepcopy(frontmatter), offset
+
+
+def invalidate_frontmatter_cache(path: Path) -> None:
+    """Drop the cached frontmatter for a note after writing it."""
+    _FM_CACHE.pop(str(path), None)
+
+
 def serialize_frontmatter(frontmatter: dict[str, Any], body: str) -> str:
     """Combine frontmatter and body into note content."""
     if not frontmatter:
         return body
 
-    fm_str = yaml.dump(frontmatter, default_flow_style=False, allow_unicode=True)
+    fm_str = yaml.dump(frontmatter, Dumper=_Dumper, default_flow_style=False, allow_unicode=True)
     return f"---\n{fm_str}---\n{body}"
 
 
@@ -65,8 +119,7 @@ class GetFrontmatterTool(Tool):
                 message=f"Note not found: {path}",
             )
 
-        content = full_path.read_text(encoding="utf-8")
-        frontmatter, _ = parse_frontmatter(content)
+        frontmatter, _ = parse_frontmatter_cached(full_path)
 
         if not frontmatter:
             return ToolResult(
@@ -120,18 +173,38 @@ class SetFrontmatterTool(Tool):
                 message=f"Note not found: {path}",
             )
 
+        # Parse the content in hand; a cached parse may predate an edit that kept mtime and size
         content = full_path.read_text(encoding="utf-8")
         existing_fm, body = parse_frontmatter(content)
+        offset = len(content) - len(body)
 
         # Merge frontmatter (new values override existing)
-        existing_fm.update(frontmatter)
+        merged_fm = {**existing_fm, **frontmatter}
 
-        # Write back
-        new_content = serialize_frontmatter(existing_fm, body)
-        full_path.write_text(new_content, encoding="utf-8")
+        if merged_fm != existing_fm:
+            invalidate_frontmatter_cache(full_path)
+            invalidate_note_caches(full_path)
+            old_block = content[:offset].encode("utf-8")
+            new_block = serialize_frontmatter(merged_fm, "").encode("utf-8")
+            if not self._overwrite_in_place(full_path, old_block, new_block):
+                new_content = serialize_frontmatter(merged_fm, body)
+                self._write_atomic(full_path, new_content)
 
         return ToolResult(
             success=True,
-            data=existing_fm,
+            data=merged_fm,
             message=f"Updated frontmatter in '{path}'",
         )
+
+    def _overwrite_in_place(self, full_path: Path, old_block: bytes, new_block: bytes) -> bool:
+        """Overwrite the frontmatter block without touching the body, if sizes match."""
+        if not old_block or len(old_block) != len(new_block):
+            return False
+
+        with open(full_path, "r+b") as f:
+            # Bail out if the file on disk differs (e.g. CRLF newlines translated on read)
+            if f.read(len(old_block)) != old_block:
+                return False
+            f.seek(0)
+            f.write(new_block)
+        return True
@@ -1,9 +1,54 @@
 """Glob tool for fast pattern matching on note paths."""
 
 import fnmatch
+import heapq
+import os
+import re
+import shutil
+import subprocess
+from collections.abc import Callable, Iterable
+from functools import lru_cache
+from operator import itemgetter
+from pathlib import Path
+
+from knap.indexer.noteio import walk_md
 
 from .base import Tool, ToolResult
 
+_RG = shutil.which("rg")
+_GLOB_CHARS = frozenset("*?[")
+
+
+@lru_cache(maxsize=256)
+def compile_glob(pattern: str) -> re.Pattern[str]:
+    """Compile a glob pattern to a regex matching like fnmatch.fnmatchcase()."""
+    # re caches compiled patterns, but fnmatch.translate() reparses the glob every call
+    return re.compile(fnmatch.translate(pattern))
+
+
+def _literal_prefix(pattern: str) -> list[str]:
+    """Return the leading directory components of pattern that contain no wildcards."""
+    prefix = []
+    for part in pattern.split("/")[:-1]:
+        if part in ("", ".", "..") or not _GLOB_CHARS.isdisjoint(part):
+            break
+        prefix.append(part)
+    return prefix
+
+
+def _resolve_prefix(root: Path, parts: list[str]) -> list[Path]:
+    """Find directories under root matching parts, comparing names case-insensitively."""
+    bases = [root]
+    for part in parts:
+        part_lower = part.lower()
+        bases = [
+            child
+            for base in bases
+            for child in base.iterdir()
+            if child.name.lower() == part_lower and child.is_dir()
+        ]
+    return bases
+
 
 class GlobNotesTool(Tool):
     """Find notes by path pattern matching."""
@@ -29,11 +74,22 @@ class GlobNotesTool(Tool):
                 "type": "string",
                 "description": "Optional folder to search in (relative to vault root). If not specified, searches entire vault.",
             },
+            "max_results": {
+                "type": "integer",
+                "description": "Maximum number of notes to return, newest first (default: all)",
+            },
         },
         "required": ["pattern"],
     }
 
-    def execute(self, pattern: str, path: str = "") -> ToolResult:
+    def execute(self, pattern: str, path: str = "", max_results: int | None = None) -> ToolResult:
+        if max_results is not None and max_results < 1:
+            return ToolResult(
+                success=False,
+                data=None,
+                message=f"max_results must be at least 1, got {max_results}",
+            )
+
         # Determine search root
         if path:
             search_root = self._validate_path(path)
@@ -46,39 +102,44 @@ class GlobNotesTool(Tool):
         else:
             search_root = self.vault_path
 
-        # Find all markdown files
-        all_files = []
-        for md_file in search_root.rglob("*.md"):
-            # Skip hidden folders
-            if any(part.startswith(".") for part in md_file.relative_to(self.vault_path).parts):
-                continue
-            all_files.append(md_file)
+        # Matches must live under the pattern's literal prefix, so only walk there
+        roots = []
+        for base in _resolve_prefix(self.vault_path, _literal_prefix(pattern)):
+            if base.is_relative_to(search_root):
+                roots.append(base)
+            elif search_root.is_relative_to(base):
+                roots.append(search_root)
+        # Hidden folders are pruned during the walk; a root inside one is skipped outright
+        roots = [
+            root
+            for root in dict.fromkeys(roots)
+            if not any(part.startswith(".") for part in root.relative_to(self.vault_path).parts)
+        ]
+
+        # Compile the pattern once (case-insensitive via lowercasing)
+        main_re = compile_glob(pattern.lower())
+        # Special case: **/*.md should also match root-level files
+        alt_re = compile_glob(pattern[3:].lower()) if pattern.startswith("**/") else None
 
-        # Apply glob pattern matching
+        # Every root lies under the vault, so relative paths are string slices
+        root_len = len(os.path.join(self.vault_path, ""))
         matching_files = []
-        for md_file in all_files:
-            rel_path = str(md_file.relative_to(self.vault_path))
-            # Match against the pattern (case-insensitive)
-            # Handle ** pattern specially to also match root files
-            pattern_lower = pattern.lower()
+        for md_file, stat in self._list_md_files(roots):
+            rel_path = os.fspath(md_file)[root_len:]
             rel_path_lower = rel_path.lower()
+            if main_re.match(rel_path_lower) or (alt_re and alt_re.match(rel_path_lower)):
+                # DirEntry.stat() reuses the scandir result where the platform provides it
+                matching_files.append((rel_path, stat().st_mtime))
 
-            matches = fnmatch.fnmatch(rel_path_lower, pattern_lower)
-
-            # Special case: **/*.md should also match root-level files
-            if not matches and pattern.startswith("**/"):
-                # Try matching without the **/ prefix
-                root_pattern = pattern[3:]
-                matches = fnmatch.fnmatch(rel_path_lower, root_pattern.lower())
-
-            if matches:
-                matching_files.append((md_file, md_file.stat().st_mtime))
-
-        # Sort by modification time (newest first)
-        matching_files.sort(key=lambda x: -x[1])
+        # Sort by modification time (newest first); only the top few when capped
+        total = len(matching_files)
+        if max_results is not None and max_results < total:
+            matching_files = heapq.nlargest(max_results, matching_files, key=itemgetter(1))
+        else:
+            matching_files.sort(key=lambda x: -x[1])
 
         # Extract just the paths
-        results = [str(f.relative_to(self.vault_path)) for f, _ in matching_files]
+        results = [rel_path for rel_path, _ in matching_files]
 
         if not results:
             return ToolResult(
@@ -87,8 +148,35 @@ class GlobNotesTool(Tool):
                 message=f"No notes found matching pattern '{pattern}'",
             )
 
+        message = f"Found {total} notes matching '{pattern}'"
+        if len(results) < total:
+            message += f" (showing {len(results)} most recent)"
+
         return ToolResult(
             success=True,
             data=results,
-            message=f"Found {len(results)} notes matching '{pattern}'",
+            message=message,
         )
+
+    def _list_md_files(
+        self, roots: list[Path]
+    ) -> Iterable[tuple[Path, Callable[[], os.stat_result]]]:
+        """List markdown files under roots, using ripgrep when it is available."""
+        if not roots:
+            return []
+
+        if _RG:
+            try:
+                proc = subprocess.run(
+                    [_RG, "--files", "--no-ignore", "--glob", "*.md", *map(str, roots)],
+                    capture_output=True,
+                )
+                # Exit code 1 means no files; anything else is an error
+                if proc.returncode in (0, 1):
+                    # Decode as the filesystem does, not with the locale encoding
+                    paths = [Path(os.fsdecode(line)) for line in proc.stdout.splitlines() if line]
+                    return [(p, p.stat) for p in paths]
+            except OSError:
+                pass
+
+        return (item for root in roots for item in walk_md(root))
@@ -1,9 +1,68 @@
 """Tools for navigating the vault structure."""
 
+import mmap
+import os
 import re
+import shutil
+import subprocess
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+from knap.indexer import VaultIndex
+from knap.indexer.noteio import walk_md
 
 from .base import Tool, ToolResult
 
+# Below this size a plain read is cheaper than setting up a mapping
+MMAP_MIN_SIZE = 4096
+
+_RG = shutil.which("rg")
+
+# Titles are taken from the first H1 within this many leading bytes of a note
+TITLE_HEAD_SIZE = 4096
+_H1_RE = re.compile(rb"^#\s+(.+)$", re.MULTILINE)
+LIST_FOLDER_WORKERS = 16
+
+
+def _read_title(path: Path) -> str | None:
+    """Return the first H1 heading in a note, looking only at its head."""
+    with open(path, "rb") as f:
+        head = f.read(TITLE_HEAD_SIZE)
+        if head.startswith(b"---\n"):
+            end = head.find(b"\n---", 3)
+            if end == -1:
+                # Frontmatter runs past the head; fall back to the whole file
+                head += f.read()
+                end = head.find(b"\n---", 3)
+            if end != -1:
+                head = head[end + 4 :]
+
+    match = _H1_RE.search(head)
+    if not match:
+        return None
+    return match.group(1).decode("utf-8", errors="replace").rstrip("\r")
+
+
+@lru_cache(maxsize=1024)
+def _compile_backlink_pattern(note_name: str) -> re.Pattern:
+    """Compile the wikilink pattern matching links to note_name."""
+    # Pattern for wikilinks: [[note]] or [[note|alias]] or [[folder/note]]
+    pattern_str = rf"\[\[(?:[^|\]]*[/\\])?{re.escape(note_name)}(?:\|[^\]]+)?\]\]"
+    # Bytes patterns skip decoding, but only fold ASCII case
+    if note_name.isascii():
+        return re.compile(pattern_str.encode(), re.IGNORECASE)
+    return re.compile(pattern_str, re.IGNORECASE)
+
+
+def _title_of(path: Path) -> str:
+    """Get a note's title from its first heading, falling back to the filename."""
+    try:
+        return _read_title(path) or path.stem
+    except Exception:
+        return path.stem
+
 
 class ListFolderTool(Tool):
     """List contents of a folder."""
@@ -43,29 +102,27 @@ class ListFolderTool(Tool):
             )
 
         items = {"folders": [], "notes": []}
+        notes = []
+
+        # scandir entries know whether they're folders without a stat per entry
+        with os.scandir(folder_path) as it:
+            entries = sorted(it, key=lambda e: os.path.normcase(e.name))
 
-        for item in sorted(folder_path.iterdir()):
+        root_len = len(os.path.join(self.vault_path, ""))
+        for entry in entries:
             # Skip hidden files/folders
-            if item.name.startswith("."):
+            if entry.name.startswith("."):
                 continue
 
-            rel_path = item.relative_to(self.vault_path)
+            if entry.is_dir():
+                items["folders"].append(entry.path[root_len:])
+            elif entry.name.endswith(".md"):
+                notes.append(Path(entry.path))
 
-            if item.is_dir():
-                items["folders"].append(str(rel_path))
-            elif item.suffix == ".md":
-                # Get note title from first heading or filename
-                title = item.stem
-                try:
-                    content = item.read_text(encoding="utf-8")
-                    # Look for first h1 heading
-                    match = re.search(r"^#\s+(.+)$", content, re.MULTILINE)
-                    if match:
-                        title = match.group(1)
-                except Exception:
-                    pass
-
-                items["notes"].append({"path": str(rel_path), "title": title})
+        # Title reads are I/O-bound, so run them in parallel (map keeps the sort order)
+        with ThreadPoolExecutor(max_workers=LIST_FOLDER_WORKERS) as pool:
+            for item, title in zip(notes, pool.map(_title_of, notes), strict=True):
+                items["notes"].append({"path": os.fspath(item)[root_len:], "title": title})
 
         return ToolResult(
             success=True,
@@ -90,6 +147,14 @@ class GetBacklinksTool(Tool):
         "required": ["path"],
     }
 
+    def __init__(self, vault_path: Path) -> None:
+        super().__init__(vault_path)
+        self._index_provider: Callable[[], VaultIndex | None] | None = None
+
+    def set_index_provider(self, provider: Callable[[], VaultIndex | None]) -> None:
+        """Set a callback returning the agent's vault index, used to answer without a scan."""
+        self._index_provider = provider
+
     def execute(self, path: str) -> ToolResult:
         path = self._ensure_md_extension(path)
         full_path = self._validate_path(path)
@@ -104,29 +169,112 @@ class GetBacklinksTool(Tool):
         # Get the note name without extension for wikilink matching
         note_name = full_path.stem
 
-        # Pattern for wikilinks: [[note]] or [[note|alias]] or [[folder/note]]
-        pattern = re.compile(
-            rf"\[\[(?:[^|\]]*[/\\])?{re.escape(note_name)}(?:\|[^\]]+)?\]\]",
-            re.IGNORECASE,
-        )
-
-        backlinks = []
+        indexed = self._indexed_backlinks(note_name, full_path)
+        if indexed is not None:
+            return ToolResult(
+                success=True,
+                data=indexed,
+                message=f"Found {len(indexed)} notes linking to '{note_name}'",
+            )
 
-        for md_file in self.vault_path.rglob("*.md"):
-            # Skip the note itself
-            if md_file == full_path:
-                continue
+        pattern = _compile_backlink_pattern(note_name)
+        # A note can only link here if it mentions the name; bytes.lower() folds ASCII
+        # exactly like the bytes pattern's IGNORECASE, so this never drops a real match
+        needle = note_name.encode().lower()
 
+        def links_here(md_file: Path) -> bool:
             try:
-                content = md_file.read_text(encoding="utf-8")
-                if pattern.search(content):
-                    rel_path = md_file.relative_to(self.vault_path)
-                    backlinks.append(str(rel_path))
+                if isinstance(pattern.pattern, str):
+                    return pattern.search(md_file.read_text(encoding="utf-8")) is not None
+                # Raw fd and a single bounded read: small notes cost open+read+close,
+                # with no fstat or buffered file object
+                fd = os.open(md_file, os.O_RDONLY)
+                try:
+                    data = os.read(fd, MMAP_MIN_SIZE)
+                    if len(data) < MMAP_MIN_SIZE:
+                        return needle in data.lower() and pattern.search(data) is not None
+                    with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                        if hasattr(mm, "madvise"):
+                            mm.madvise(mmap.MADV_SEQUENTIAL)
+                        return pattern.search(mm) is not None
+                finally:
+                    os.close(fd)
             except Exception:
-                continue
+                return False
+
+        # ripgrep narrows the candidates down to files mentioning the name at all
+        candidates = self._rg_candidates(note_name) if _RG else None
+        if candidates is None:
+            # Like rg and the scanner behind the index, skip hidden folders such as .trash
+            candidates = (md_file for md_file, _ in walk_md(self.vault_path))
+        md_files = [f for f in candidates if f != full_path]
+
+        # Reads are I/O-bound, so fan them out across threads (map keeps walk order)
+        workers = min(32, (os.cpu_count() or 1) * 4)
+        root_len = len(os.path.join(self.vault_path, ""))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            hits = pool.map(links_here, md_files)
+            backlinks = [
+                os.fspath(md_file)[root_len:]
+                for md_file, hit in zip(md_files, hits, strict=True)
+                if hit
+            ]
 
         return ToolResult(
             success=True,
             data=backlinks,
             message=f"Found {len(backlinks)} notes linking to '{note_name}'",
         )
+
+    def _indexed_backlinks(self, note_name: str, full_path: Path) -> list[str] | None:
+        """Look backlinks up in the vault index, or return None if it can't be trusted."""
+        index = self._index_provider() if self._index_provider else None
+        # The scanner keys links by Path.stem, which mangles names containing dots
+        if index is None or index.backlinks is None or "." in note_name:
+            return None
+
+        # Any note modified since the index was built may have gained links, and a
+        # rename keeps the mtime, so the set of notes must also match the index
+        indexed_paths = index.by_path
+        root_len = len(os.path.join(self.vault_path, ""))
+        seen = 0
+        for md_file, stat in walk_md(self.vault_path):
+            if stat().st_mtime > index.last_indexed:
+                return None
+            if os.fspath(md_file)[root_len:] not in indexed_paths:
+                return None
+            seen += 1
+        if seen != len(indexed_paths):
+            return None
+
+        self_path = str(full_path.relative_to(self.vault_path))
+        return [p for p in index.backlinks.get(note_name.lower(), []) if p != self_path]
+
+    def _rg_candidates(self, note_name: str) -> list[Path] | None:
+        """List notes containing note_name via ripgrep, or None if rg fails."""
+        try:
+            proc = subprocess.run(
+                [
+                    _RG,
+                    "--files-with-matches",
+                    "--no-messages",
+                    "--no-ignore",
+                    "--ignore-case",
+                    "--fixed-strings",
+                    "--glob",
+                    "*.md",
+                    "-e",
+                    note_name,
+                    str(self.vault_path),
+                ],
+                capture_output=True,
+                text=True,
+            )
+        except OSError:
+            return None
+
+        # Exit code 1 means no matches; anything else is an error
+        if proc.returncode not in (0, 1):
+            return None
+
+        return sorted(Path(line) for line in proc.stdout.splitlines() if line)
@@ -1,9 +1,126 @@
 """Tools for reading and searching notes."""
 
+import mmap
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
 from typing import Literal
 
+from knap.indexer.noteio import decode_note, read_fd, read_note_bytes, walk_md
+
 from .base import Tool, ToolResult
+from .glob import compile_glob
+
+# Note reads are I/O-bound, so use more threads than cores
+GREP_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Notes at least this big are mapped for case-sensitive literal checks instead of read in
+MMAP_MIN_SIZE = 64 * 1024
+
+# Matching lines shown per note in content mode
+MAX_MATCHES_PER_FILE = 5
+
+# Line breaks splitlines() honours besides "\n" (decoding already turns "\r" into "\n")
+_OTHER_LINE_BREAKS = re.compile("[\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+# Formatted read_note output per (note, path as given, offset, limit):
+# ((mtime_ns, size, inode), content, message)
+_READ_CACHE: dict[
+    tuple[str, str, int | None, int | None], tuple[tuple[int, int, int], str, str]
+] = {}
+READ_CACHE_MAX = 64
+# Larger notes aren't cached, to bound memory
+READ_CACHE_MAX_SIZE = 1024 * 1024
+
+# Per searched tag, whether each note matched: {note: ((mtime_ns, size, inode), matched)}
+_TAG_CACHE: dict[str, dict[str, tuple[tuple[int, int, int], bool]]] = {}
+TAG_CACHE_MAX = 32
+
+# Escapes that can match a newline (or start/end of the whole string)
+_NEWLINE_ESCAPES = frozenset("sWDnrtfvxuUNAZ0")
+_ESCAPE_RE = re.compile(r"\\(.)", re.DOTALL)
+
+
+def _is_line_local(pattern: str) -> bool:
+    """Whether pattern can never match across a newline, so one whole-note scan
+    finds the same lines as searching each line separately."""
+    if "\n" in pattern or "[^" in pattern or "(?" in pattern:
+        return False
+    return not any(m.group(1) in _NEWLINE_ESCAPES for m in _ESCAPE_RE.finditer(pattern))
+
+
+def _required_literal(pattern: str, flags: int) -> tuple[str, bool] | None:
+    """Find the longest literal run every match of pattern must contain.
+
+    Returns (literal, ignore_case), or None when there's no usable literal.
+    """
+    try:
+        parsed = re._parser.parse(pattern, flags)
+    except Exception:
+        return None
+    ignore_case = bool(parsed.state.flags & re.IGNORECASE)
+
+    best, run = "", []
+    for op, arg in [*parsed, (None, None)]:
+        if op is re._constants.LITERAL:
+            run.append(chr(arg))
+            continue
+        if len(run) > len(best):
+            best = "".join(run)
+        run = []
+
+    # Unicode case folding has exceptions (e.g. dotless i), so only fold ASCII literals
+    if len(best) < 2 or (ignore_case and not best.isascii()):
+        return None
+    return (best.casefold() if ignore_case else best), ignore_case
+
+
+# re.IGNORECASE matches both of these with "i", which casefold() alone doesn't reproduce
+_DOTTED_I = str.maketrans({"\u0130": "i", "\u0131": "i"})
+
+
+def _casefold(content: str) -> str:
+    """Fold case the way re.IGNORECASE does for ASCII letters."""
+    # casefold() already maps the long s and Kelvin sign like re does
+    if not content.isascii():
+        content = content.translate(_DOTTED_I)
+    return content.casefold()
+
+
+def invalidate_note_caches(path: Path) -> None:
+    """Drop cached read_note output and tag matches for a note after writing it in place."""
+    key = str(path)
+    for cache_key in [k for k in _READ_CACHE if k[0] == key]:
+        del _READ_CACHE[cache_key]
+    for matches in _TAG_CACHE.values():
+        matches.pop(key, None)
+
+
+@lru_cache(maxsize=256)
+def _compile_tag_patterns(
+    tag: str,
+) -> tuple[re.Pattern[str], re.Pattern[str], re.Pattern[bytes] | None, re.Pattern[bytes] | None]:
+    r"""Compile the inline and frontmatter patterns for tag, as str and (for ASCII tags) bytes.
+
+    On ASCII notes an ASCII tag matches the same with the bytes patterns, so those notes
+    skip decoding. A str \s also matches the ASCII separators 0x1c-0x1f; a bytes \s doesn't.
+    """
+    escaped = re.escape(tag)
+    # Pattern for inline tags
+    inline = re.compile(rf"#\b{escaped}\b", re.IGNORECASE)
+    # Pattern for frontmatter tags, kept inside the list so it never scans past its "]"
+    frontmatter = re.compile(rf"tags:\s*\[[^\]]*?\b{escaped}\b[^\]]*\]", re.IGNORECASE)
+
+    if not tag.isascii():
+        return inline, frontmatter, None, None
+    tag_bytes = escaped.encode("ascii")
+    inline_bytes = re.compile(rb"#\b" + tag_bytes + rb"\b", re.IGNORECASE)
+    frontmatter_bytes = re.compile(
+        rb"tags:[\s\x1c-\x1f]*\[[^\]]*?\b" + tag_bytes + rb"\b[^\]]*\]", re.IGNORECASE
+    )
+    return inline, frontmatter, inline_bytes, frontmatter_bytes
 
 
 class ReadNoteTool(Tool):
@@ -37,35 +154,55 @@ class ReadNoteTool(Tool):
         path = self._ensure_md_extension(path)
         full_path = self._validate_path(path)
 
-        if not full_path.exists():
+        try:
+            st = full_path.stat()
+        except FileNotFoundError:
             return ToolResult(
                 success=False,
                 data=None,
                 message=f"Note not found: {path}",
             )
 
-        content = full_path.read_text(encoding="utf-8")
-        lines = content.splitlines()
-        total_lines = len(lines)
-
-        # Apply offset and limit if provided
-        start_line = 1
-        if offset is not None:
-            start_line = max(1, offset)
-
-        end_line = total_lines
-        if limit is not None:
-            end_line = min(total_lines, start_line + limit - 1)
-
-        # Extract the requested lines (convert to 0-indexed for slicing)
-        selected_lines = lines[start_line - 1 : end_line]
+        # Agents often re-read a note between steps; reuse the output while it's unchanged
+        key = (str(full_path), path, offset, limit)
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        cached = _READ_CACHE.get(key)
+        if cached and cached[0] == stamp:
+            return ToolResult(success=True, data=cached[1], message=cached[2])
+
+        if offset is None and limit is None:
+            content = full_path.read_text(encoding="utf-8")
+            selected_lines = content.splitlines()
+            total_lines = len(selected_lines)
+            start_line, end_line = 1, total_lines
+        else:
+            # Stream the note so only the requested range is kept in memory
+            start_line = 1
+            if offset is not None:
+                start_line = max(1, offset)
+            stop_line = start_line + limit if limit is not None else None
+
+            selected_lines = []
+            total_lines = 0
+            with full_path.open(encoding="utf-8") as f:
+                for physical_line in f:
+                    # Split again so line numbers match content.splitlines(), which also
+                    # breaks on separators like form feeds
+                    for line in physical_line.splitlines():
+                        total_lines += 1
+                        if total_lines >= start_line and (
+                            stop_line is None or total_lines < stop_line
+                        ):
+                            selected_lines.append(line)
+
+            end_line = total_lines
+            if limit is not None:
+                end_line = min(total_lines, start_line + limit - 1)
 
         # Format with line numbers (like cat -n)
-        formatted_lines = []
-        for i, line in enumerate(selected_lines, start=start_line):
-            formatted_lines.append(f"{i:6}\t{line}")
-
-        formatted_content = "\n".join(formatted_lines)
+        formatted_content = "\n".join(
+            f"{i:6}\t{line}" for i, line in enumerate(selected_lines, start=start_line)
+        )
 
         # Build message
         if offset is not None or limit is not None:
@@ -73,6 +210,12 @@ class ReadNoteTool(Tool):
         else:
             message = f"Read note: {path} ({total_lines} lines, {len(content)} chars)"
 
+        if st.st_size <= READ_CACHE_MAX_SIZE:
+            _READ_CACHE.pop(key, None)
+            if len(_READ_CACHE) >= READ_CACHE_MAX:
+                del _READ_CACHE[next(iter(_READ_CACHE))]
+            _READ_CACHE[key] = (stamp, formatted_content, message)
+
         return ToolResult(
             success=True,
             data=formatted_content,
@@ -130,12 +273,16 @@ class GrepNotesTool(Tool):
         max_results: int = 20,
         glob: str | None = None,
     ) -> ToolResult:
-        import fnmatch
-
         # Compile regex
         flags = re.IGNORECASE if case_insensitive else 0
         try:
             regex = re.compile(pattern, flags)
+            # Whole-note regex, where ^ and $ still anchor at each line
+            note_regex = (
+                re.compile(pattern, flags | re.MULTILINE) if _is_line_local(pattern) else None
+            )
+            # A literal every match must contain lets most notes be ruled out without the regex
+            literal = _required_literal(pattern, flags)
         except re.error as e:
             return ToolResult(
                 success=False,
@@ -143,44 +290,127 @@ class GrepNotesTool(Tool):
                 message=f"Invalid regex pattern: {e}",
             )
 
-        results = []
-        files_searched = 0
-
-        for md_file in self.vault_path.rglob("*.md"):
-            # Skip hidden folders
-            try:
-                rel_parts = md_file.relative_to(self.vault_path).parts
-                if any(part.startswith(".") for part in rel_parts):
-                    continue
-            except ValueError:
-                continue
-
-            rel_path = str(md_file.relative_to(self.vault_path))
+        # UTF-8 is self-synchronizing, so the literal's encoding is in the raw bytes exactly
+        # when the literal is in the text. Line breaks are translated on decode, so a literal
+        # containing one can only be checked afterwards; a case-insensitive literal is ASCII
+        # and is only compared against ASCII notes, where bytes.lower() folds like re does.
+        needle_bytes = None
+        if literal and "\n" not in literal[0] and "\r" not in literal[0]:
+            needle_bytes = literal[0].encode("utf-8")
+        case_sensitive_bytes = needle_bytes is not None and not literal[1]
+
+        # Same matching as fnmatch.fnmatch(), with the translated pattern cached across calls
+        glob_re = compile_glob(os.path.normcase(glob)) if glob else None
+
+        # Collect candidates up front so the reads can be fanned out
+        candidates = []
+        # The walk joins names onto the vault path, so slicing it off gives the relative path
+        root_len = len(os.path.join(self.vault_path, ""))
+        for md_file, _ in walk_md(self.vault_path):
+            rel_path = os.fspath(md_file)[root_len:]
 
             # Apply glob filter if provided
-            if glob and not fnmatch.fnmatch(rel_path, glob):
+            if glob_re and not glob_re.match(os.path.normcase(rel_path)):
                 continue
 
+            candidates.append((md_file, rel_path))
+
+        def scan(md_file: Path) -> tuple[list[str], list[tuple[int, str]], int] | None:
             try:
-                content = md_file.read_text(encoding="utf-8")
-                lines = content.splitlines()
-                files_searched += 1
+                fd = os.open(md_file, os.O_RDONLY)
+                try:
+                    size = os.fstat(fd).st_size
+                    if case_sensitive_bytes and size >= MMAP_MIN_SIZE:
+                        # A large note that lacks the literal is ruled out without copying it
+                        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+                            if mapped.find(needle_bytes) == -1:
+                                return [], [], 0
+                            raw = mapped[:]
+                    else:
+                        raw = read_fd(fd, size)
+                finally:
+                    os.close(fd)
+            except Exception:
+                return None
+            if literal:
+                needle, ignore_case = literal
+                # Most notes are ruled out on the raw bytes, so they're never decoded
+                checked = needle_bytes is not None and (not ignore_case or raw.isascii())
+                if checked and needle_bytes not in (raw.lower() if ignore_case else raw):
+                    return [], [], 0
+            try:
+                content = decode_note(raw)
+            except UnicodeDecodeError:
+                return None
+            if literal and not checked:
+                if needle not in (_casefold(content) if ignore_case else content):
+                    return [], [], 0
+            match_lines = []
+            match_count = 0
+            # splitlines() also breaks on rarer separators; only scan whole notes
+            # when "\n" is the sole line break, so line numbers agree
+            if note_regex and not _OTHER_LINE_BREAKS.search(content):
+                # A match right after a trailing newline isn't on any line
+                last_start = len(content) - (content[-1:] in ("", "\n"))
+                if output_mode == "files_with_matches":
+                    m = note_regex.search(content)
+                    return [], [], int(m is not None and m.start() <= last_start)
+                if output_mode == "count":
+                    starts = (m.start() for m in note_regex.finditer(content))
+                    return [], [], sum(1 for start in starts if start <= last_start)
 
-                # Find all matches
-                match_lines = []
+                lines = content.splitlines()
+                line_num, pos = 1, 0
+                for m in note_regex.finditer(content):
+                    if m.start() > last_start:
+                        break
+                    line_num += content.count("\n", pos, m.start())
+                    pos = m.start()
+                    if not match_lines or match_lines[-1][0] != line_num:
+                        # Only the first few matching lines are shown, so stop there
+                        if len(match_lines) == MAX_MATCHES_PER_FILE:
+                            break
+                        match_lines.append((line_num, lines[line_num - 1]))
+                    match_count += 1
+            else:
+                lines = content.splitlines()
                 for line_num, line in enumerate(lines, 1):
-                    if regex.search(line):
-                        match_lines.append((line_num, line))
+                    if not regex.search(line):
+                        continue
+                    if output_mode == "files_with_matches":
+                        return [], [], 1
+                    if output_mode != "content":
+                        match_count += len(regex.findall(line))
+                        continue
+                    match_count += 1
+                    match_lines.append((line_num, line))
+                    if len(match_lines) == MAX_MATCHES_PER_FILE:
+                        break
+
+            # Only keep the lines around when they're needed for output
+            return (lines if match_lines else [], match_lines, match_count)
 
-                if not match_lines:
+        results = []
+        files_searched = 0
+
+        # map() keeps vault order; leaving the loop early cancels the remaining reads
+        pool = ThreadPoolExecutor(max_workers=GREP_WORKERS)
+        try:
+            scanned = pool.map(scan, [md_file for md_file, _ in candidates])
+            for (_, rel_path), outcome in zip(candidates, scanned, strict=True):
+                if outcome is None:
+                    continue
+                files_searched += 1
+                lines, match_lines, match_count = outcome
+
+                if not match_count:
                     continue
 
                 if output_mode == "files_with_matches":
                     results.append(rel_path)
 
                 elif output_mode == "count":
-                    total_matches = sum(len(regex.findall(line)) for _, line in match_lines)
-                    results.append({"path": rel_path, "count": total_matches})
+                    results.append({"path": rel_path, "count": match_count})
 
                 elif output_mode == "content":
                     # Build context for each match
@@ -188,27 +418,28 @@ class GrepNotesTool(Tool):
                     for line_num, _line in match_lines:
                         # Get context lines
                         context_start = max(0, line_num - 1 - context_lines)
-                        context_end = min(len(lines), line_num + context_lines)
+                        context_end = max(context_start, min(len(lines), line_num + context_lines))
 
-                        context_block = []
-                        for ctx_num in range(context_start, context_end):
-                            prefix = ">" if ctx_num == line_num - 1 else " "
-                            context_block.append(f"{prefix}{ctx_num + 1:4}: {lines[ctx_num]}")
+                        context_block = [
+                            f"{'>' if ctx_num == line_num else ' '}{ctx_num:4}: {ctx_line}"
+                            for ctx_num, ctx_line in enumerate(
+                                lines[context_start:context_end], start=context_start + 1
+                            )
+                        ]
 
                         file_matches.append("\n".join(context_block))
 
                     results.append(
                         {
                             "path": rel_path,
-                            "matches": file_matches[:5],  # Limit matches per file
+                            "matches": file_matches,
                         }
                     )
 
                 if len(results) >= max_results:
                     break
-
-            except Exception:
-                continue
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
 
         if not results:
             return ToolResult(
@@ -245,25 +476,50 @@ class SearchByTagTool(Tool):
         tag = tag.lstrip("#")
         results = []
 
-        # Pattern for inline tags
-        inline_pattern = re.compile(rf"#\b{re.escape(tag)}\b", re.IGNORECASE)
-
-        # Pattern for frontmatter tags
-        frontmatter_pattern = re.compile(
-            rf"tags:\s*\[.*?\b{re.escape(tag)}\b.*?\]", re.IGNORECASE | re.DOTALL
+        inline_pattern, frontmatter_pattern, inline_bytes, frontmatter_bytes = (
+            _compile_tag_patterns(tag)
         )
 
-        for md_file in self.vault_path.rglob("*.md"):
+        # Both patterns need the tag itself, so a plain substring test rules out most notes.
+        # Like _required_literal, only ASCII tags are folded this way.
+        needle = tag.lower() if tag.isascii() else None
+        needle_bytes = needle.encode("ascii") if needle is not None else None
+
+        def has_tag(md_file: Path) -> bool:
+            raw = read_note_bytes(md_file)
+            if inline_bytes and raw.isascii():
+                if needle_bytes not in raw.lower():
+                    return False
+                content, inline, frontmatter = raw, inline_bytes, frontmatter_bytes
+            else:
+                content = decode_note(raw)
+                if needle is not None and needle not in _casefold(content):
+                    return False
+                inline, frontmatter = inline_pattern, frontmatter_pattern
+            return bool(inline.search(content) or frontmatter.search(content))
+
+        # Repeat searches for a tag only re-read notes that changed since the last one
+        previous = _TAG_CACHE.pop(tag, {})
+        matches = {}
+        root_len = len(os.path.join(self.vault_path, ""))
+        for md_file, stat in walk_md(self.vault_path):
+            key = os.fspath(md_file)
             try:
-                content = md_file.read_text(encoding="utf-8")
-
-                if inline_pattern.search(content) or frontmatter_pattern.search(content):
-                    rel_path = md_file.relative_to(self.vault_path)
-                    results.append(str(rel_path))
-
+                st = stat()
+                stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+                cached = previous.get(key)
+                matched = cached[1] if cached and cached[0] == stamp else has_tag(md_file)
             except Exception:
                 continue
 
+            matches[key] = (stamp, matched)
+            if matched:
+                results.append(key[root_len:])
+
+        if len(_TAG_CACHE) >= TAG_CACHE_MAX:
+            del _TAG_CACHE[next(iter(_TAG_CACHE))]
+        _TAG_CACHE[tag] = matches
+
         if not results:
             return ToolResult(
                 success=True,
@@ -1,5 +1,6 @@
 """Task tracking tool for multi-step operations."""
 
+from collections import Counter
 from collections.abc import Callable
 from pathlib import Path
 from typing import Any
@@ -74,9 +75,10 @@ class TodoWriteTool(Tool):
             self._update_callback(tasks)
 
         # Count by status
-        pending = sum(1 for t in tasks if t.status == TaskStatus.PENDING)
-        in_progress = sum(1 for t in tasks if t.status == TaskStatus.IN_PROGRESS)
-        completed = sum(1 for t in tasks if t.status == TaskStatus.COMPLETED)
+        counts = Counter(t.status for t in tasks)
+        pending = counts[TaskStatus.PENDING]
+        in_progress = counts[TaskStatus.IN_PROGRESS]
+        completed = counts[TaskStatus.COMPLETED]
 
         return ToolResult(
             success=True,
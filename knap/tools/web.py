@@ -31,12 +31,14 @@ class WebSearchTool(Tool):
 
     def __init__(self) -> None:
         # No vault_path needed for web search
-        pass
+        self._ddgs: DDGS | None = None
 
     def execute(self, query: str, max_results: int = 5) -> ToolResult:
         try:
-            with DDGS() as ddgs:
-                results = list(ddgs.text(query, max_results=max_results))
+            # Created on first use and kept, so later searches reuse its HTTP connections
+            if self._ddgs is None:
+                self._ddgs = DDGS()
+            results = self._ddgs.text(query, max_results=max_results)
 
             if not results:
                 return ToolResult(
@@ -1,6 +1,10 @@
 """Tools for creating and modifying notes."""
 
+import os
+
 from .base import Tool, ToolResult
+from .frontmatter import invalidate_frontmatter_cache
+from .read import invalidate_note_caches
 
 
 class CreateNoteTool(Tool):
@@ -34,17 +38,23 @@ class CreateNoteTool(Tool):
         path = self._ensure_md_extension(path)
         full_path = self._validate_path(path)
 
-        if full_path.exists():
+        # Create parent directories if needed
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # O_EXCL makes the existence check and the create a single atomic step
+        try:
+            fd = os.open(full_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
             return ToolResult(
                 success=False,
                 data=None,
                 message=f"Note already exists: {path}. Use update_note to modify it.",
             )
-
-        # Create parent directories if needed
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-
-        full_path.write_text(content, encoding="utf-8")
+        with os.fdopen(fd, "wb") as f:
+            f.write(content.encode("utf-8"))
+        # A recreated note can reuse an old inode, size and mtime
+        invalidate_note_caches(full_path)
+        invalidate_frontmatter_cache(full_path)
         return ToolResult(
             success=True,
             data={"path": path},
@@ -87,7 +97,11 @@ class UpdateNoteTool(Tool):
                 message=f"Note not found: {path}. Use create_note to create it.",
             )
 
-        full_path.write_text(content, encoding="utf-8")
+        # Replace rather than truncate, so a failed write never leaves a partial note
+        self._write_atomic(full_path, content)
+        # Inodes get reused, so don't rely on the new one alone to show the change
+        invalidate_note_caches(full_path)
+        invalidate_frontmatter_cache(full_path)
         return ToolResult(
             success=True,
             data={"path": path},
@@ -131,12 +145,16 @@ class AppendToNoteTool(Tool):
                 message=f"Note not found: {path}",
             )
 
-        existing = full_path.read_text(encoding="utf-8")
-        # Ensure there's a newline between existing and new content
-        if existing and not existing.endswith("\n"):
-            content = "\n" + content
-
-        full_path.write_text(existing + content, encoding="utf-8")
+        # Append in place so only the last byte of the existing note is read
+        with full_path.open("ab+") as f:
+            # Ensure there's a newline between existing and new content
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) not in (b"\n", b"\r"):
+                    content = "\n" + content
+            f.write(content.encode("utf-8"))
+        invalidate_note_caches(full_path)
+        invalidate_frontmatter_cache(full_path)
         return ToolResult(
             success=True,
             data={"path": path},
@@ -176,6 +194,8 @@ class DeleteNoteTool(Tool):
             )
 
         full_path.unlink()
+        invalidate_note_caches(full_path)
+        invalidate_frontmatter_cache(full_path)
         return ToolResult(
             success=True,
             data={"path": path},
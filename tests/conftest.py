@@ -1,16 +1,21 @@
 """Shared test fixtures."""
 
+import os
+import shutil
 from pathlib import Path
 
 import pytest
 
+from knap.config import Settings
+from knap.indexer import VaultIndex, VaultScanner
+
+# test_agent.py pulls in the OpenAI SDK, the slowest import in the suite.
+# Set KNAP_SKIP_AGENT_TESTS=1 to leave it out of quick runs.
+collect_ignore_glob = ["test_agent.py"] if os.environ.get("KNAP_SKIP_AGENT_TESTS") else []
 
-@pytest.fixture
-def tmp_vault(tmp_path: Path) -> Path:
-    """Create a temporary vault directory with sample notes."""
-    vault = tmp_path / "vault"
-    vault.mkdir()
 
+def _write_sample_notes(vault: Path) -> None:
+    """Populate a vault directory with the sample notes."""
     # Create some sample notes
     (vault / "Note1.md").write_text("# Note 1\n\nThis is note 1 content.\n\n#tag1 #tag2")
     (vault / "Note2.md").write_text(
@@ -26,9 +31,71 @@ def tmp_vault(tmp_path: Path) -> Path:
     daily = vault / "Daily Notes"
     daily.mkdir()
 
+
+@pytest.fixture(scope="session")
+def _vault_template(tmp_path_factory) -> Path:
+    """Sample vault written once per run; only ever copied, never handed to tests."""
+    vault = tmp_path_factory.mktemp("vault_template")
+    _write_sample_notes(vault)
     return vault
 
 
+@pytest.fixture
+def tmp_vault(tmp_path: Path, _vault_template: Path) -> Path:
+    """Create a temporary vault directory with sample notes."""
+    vault = tmp_path / "vault"
+    # copyfile rather than copy2, so notes get fresh mtimes as if just written
+    shutil.copytree(_vault_template, vault, copy_function=shutil.copyfile)
+    return vault
+
+
+@pytest.fixture(scope="session")
+def shared_vault(tmp_path_factory) -> Path:
+    """Sample vault built once per run, for tests that never write notes into it."""
+    vault = tmp_path_factory.mktemp("shared_vault")
+    _write_sample_notes(vault)
+    return vault
+
+
+@pytest.fixture(scope="session")
+def shared_index(shared_vault: Path) -> VaultIndex:
+    """Index of the shared vault, scanned once per run. Deep-copy it before mutating."""
+    return VaultScanner(shared_vault).scan()
+
+
+@pytest.fixture(scope="session")
+def big_vault(tmp_path_factory) -> Path:
+    """500 linked, tagged notes across 20 folders, for tests marked slow. Read-only."""
+    vault = tmp_path_factory.mktemp("big_vault")
+    for f in range(20):
+        (vault / f"Folder{f}").mkdir()
+    for i in range(500):
+        (vault / f"Folder{i % 20}" / f"N{i}.md").write_text(
+            f"# N{i}\n\nDescription of note {i}.\n\nSee [[N{(i + 1) % 500}]] and [[N0]].\n\n"
+            f"#tag{i % 25}\n"
+        )
+    return vault
+
+
+@pytest.fixture(scope="session")
+def session_settings(shared_vault: Path) -> Settings:
+    """Validate settings once per run, without touching os.environ or .env."""
+    return Settings(
+        telegram_bot_token="test-token",
+        openai_api_key="test-key",
+        vault_path=shared_vault,
+        allowed_user_ids="12345",
+        _env_file=None,
+    )
+
+
+@pytest.fixture
+def mock_settings(session_settings: Settings, tmp_vault: Path) -> Settings:
+    """Create mock settings for testing, pointed at this test's vault."""
+    # model_copy skips validation, so resolve the path like the validator would
+    return session_settings.model_copy(update={"vault_path": tmp_vault.resolve()})
+
+
 @pytest.fixture
 def sample_note_content() -> str:
     """Sample note content for testing."""
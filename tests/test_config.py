@@ -1,76 +1,79 @@
 """Tests for config module."""
 
+from collections.abc import Callable
 from pathlib import Path
 
 import pytest
 
 from knap.config import Settings
 
+BASE_ENV = {
+    "TELEGRAM_BOT_TOKEN": "test-token",
+    "OPENAI_API_KEY": "test-key",
+    "ALLOWED_USER_IDS": "12345",
+}
 
-class TestSettings:
-    """Tests for Settings class."""
 
-    def test_allowed_users_single(self, tmp_vault: Path, monkeypatch):
-        """Test parsing single user ID."""
-        monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test-token")
-        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
-        monkeypatch.setenv("VAULT_PATH", str(tmp_vault))
-        monkeypatch.setenv("ALLOWED_USER_IDS", "12345")
+@pytest.fixture
+def set_env(monkeypatch) -> Callable[..., None]:
+    """Return a setter applying BASE_ENV plus overrides in one call; None unsets a variable."""
 
-        settings = Settings()
-        assert settings.allowed_users == [12345]
+    def apply(**overrides: str | None) -> None:
+        for name, value in {**BASE_ENV, **overrides}.items():
+            if value is None:
+                monkeypatch.delenv(name, raising=False)
+            else:
+                monkeypatch.setenv(name, value)
 
-    def test_allowed_users_multiple(self, tmp_vault: Path, monkeypatch):
-        """Test parsing multiple user IDs."""
-        monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test-token")
-        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
-        monkeypatch.setenv("VAULT_PATH", str(tmp_vault))
-        monkeypatch.setenv("ALLOWED_USER_IDS", "12345, 67890, 11111")
-
-        settings = Settings()
-        assert settings.allowed_users == [12345, 67890, 11111]
+    return apply
 
-    def test_default_model(self, tmp_vault: Path, monkeypatch):
-        """Test default OpenAI model."""
-        monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test-token")
-        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
-        monkeypatch.setenv("VAULT_PATH", str(tmp_vault))
-        monkeypatch.setenv("ALLOWED_USER_IDS", "12345")
-        monkeypatch.delenv("OPENAI_MODEL", raising=False)
 
-        settings = Settings(_env_file=None)
-        assert settings.openai_model == "gpt-5-nano"
+class TestSettings:
+    """Tests for Settings class."""
 
-    def test_custom_model(self, tmp_vault: Path, monkeypatch):
-        """Test custom OpenAI model."""
-        monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test-token")
-        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
-        monkeypatch.setenv("VAULT_PATH", str(tmp_vault))
-        monkeypatch.setenv("ALLOWED_USER_IDS", "12345")
-        monkeypatch.setenv("OPENAI_MODEL", "gpt-5-nano")
+    @pytest.mark.parametrize(
+        ("ids_env", "expected"),
+        [
+            ("12345", [12345]),
+            ("12345, 67890, 11111", [12345, 67890, 11111]),
+        ],
+        ids=["single", "multiple"],
+    )
+    def test_allowed_users(self, set_env, tmp_vault: Path, ids_env, expected):
+        """Test parsing allowed user IDs."""
+        set_env(VAULT_PATH=str(tmp_vault), ALLOWED_USER_IDS=ids_env)
 
         settings = Settings()
-        assert settings.openai_model == "gpt-5-nano"
+        assert settings.allowed_users == expected
+
+    @pytest.mark.parametrize(
+        ("model_env", "expected_model"),
+        [
+            (None, "gpt-5-nano"),
+            ("gpt-5-nano", "gpt-5-nano"),
+        ],
+        ids=["default", "custom"],
+    )
+    def test_model(self, set_env, tmp_vault: Path, model_env, expected_model):
+        """Test default and custom OpenAI model."""
+        set_env(VAULT_PATH=str(tmp_vault), OPENAI_MODEL=model_env)
+
+        settings = Settings(_env_file=None)
+        assert settings.openai_model == expected_model
 
-    def test_vault_path_validation_not_exists(self, tmp_path: Path, monkeypatch):
+    def test_vault_path_validation_not_exists(self, set_env, tmp_path: Path):
         """Test vault path validation when path doesn't exist."""
-        monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test-token")
-        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
-        monkeypatch.setenv("VAULT_PATH", str(tmp_path / "nonexistent"))
-        monkeypatch.setenv("ALLOWED_USER_IDS", "12345")
+        set_env(VAULT_PATH=str(tmp_path / "nonexistent"))
 
         with pytest.raises(ValueError, match="does not exist"):
             Settings()
 
-    def test_vault_path_validation_not_directory(self, tmp_path: Path, monkeypatch):
+    def test_vault_path_validation_not_directory(self, set_env, tmp_path: Path):
         """Test vault path validation when path is not a directory."""
         file_path = tmp_path / "file.txt"
         file_path.touch()
 
-        monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test-token")
-        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
-        monkeypatch.setenv("VAULT_PATH", str(file_path))
-        monkeypatch.setenv("ALLOWED_USER_IDS", "12345")
+        set_env(VAULT_PATH=str(file_path))
 
         with pytest.raises(ValueError, match="not a directory"):
             Settings()
@@ -1,11 +1,27 @@
 """Tests for indexer module."""
 
+import copy
+import os
 from pathlib import Path
 
+import pytest
+
 from knap.indexer.scanner import FolderInfo, NoteInfo, VaultIndex, VaultScanner
 from knap.indexer.summary import generate_compact_summary, generate_vault_summary
 
 
+@pytest.fixture(scope="session")
+def frontmatter_index(shared_vault: Path) -> VaultIndex:
+    """Shared vault scanned for frontmatter and titles only."""
+    return VaultScanner(shared_vault).scan(parse_body=False)
+
+
+@pytest.fixture(scope="session")
+def big_index(big_vault: Path) -> VaultIndex:
+    """The 500-note vault, scanned once per run."""
+    return VaultScanner(big_vault).scan()
+
+
 class TestNoteInfo:
     """Tests for NoteInfo dataclass."""
 
@@ -41,6 +57,14 @@ class TestNoteInfo:
         assert note.title == "Test"
         assert note.tags == ["tag1"]
 
+    def test_from_dict_tolerates_unknown_and_missing_keys(self):
+        data = {"path": "test.md", "title": "Test", "description": "", "future_field": 1}
+
+        note = NoteInfo.from_dict(data)
+        assert note.path == "test.md"
+        assert note.tags == []
+        assert note.size == 0
+
     def test_summary_and_concepts_fields(self):
         note = NoteInfo(
             path="test.md",
@@ -139,40 +163,37 @@ class TestVaultIndex:
 class TestVaultScanner:
     """Tests for VaultScanner."""
 
-    def test_scan_vault(self, tmp_vault: Path):
-        scanner = VaultScanner(tmp_vault)
-        index = scanner.scan()
-
-        assert index.total_notes >= 3
-        assert len(index.notes) >= 3
-
-    def test_scan_extracts_title_from_frontmatter(self, tmp_vault: Path):
-        scanner = VaultScanner(tmp_vault)
-        index = scanner.scan()
+    def test_scan_vault(self, shared_index: VaultIndex):
+        assert shared_index.total_notes >= 3
+        assert len(shared_index.notes) >= 3
 
-        note2 = next((n for n in index.notes if "Note2" in n.path), None)
+    def test_scan_extracts_title_from_frontmatter(self, frontmatter_index: VaultIndex):
+        note2 = frontmatter_index.by_path.get("Note2.md")
         assert note2 is not None
         assert note2.title == "Custom Title"
 
-    def test_scan_extracts_title_from_filename(self, tmp_vault: Path):
-        scanner = VaultScanner(tmp_vault)
-        index = scanner.scan()
-
+    def test_scan_extracts_title_from_filename(self, frontmatter_index: VaultIndex):
         # Note1 has H1 heading, should use that
-        note1 = next((n for n in index.notes if "Note1" in n.path), None)
+        note1 = frontmatter_index.by_path.get("Note1.md")
         assert note1 is not None
         assert note1.title == "Note 1"
 
-    def test_scan_extracts_tags(self, tmp_vault: Path):
-        scanner = VaultScanner(tmp_vault)
-        index = scanner.scan()
-
+    def test_scan_extracts_tags(self, shared_index: VaultIndex):
         # Should find inline tags from Note1
-        assert "tag1" in index.tags
-        assert "tag2" in index.tags
+        assert "tag1" in shared_index.tags
+        assert "tag2" in shared_index.tags
 
         # Should find frontmatter tags from Note2
-        assert "project" in index.tags
+        assert "project" in shared_index.tags
+
+    def test_scan_without_body_keeps_frontmatter_only(self, frontmatter_index: VaultIndex):
+        note1 = frontmatter_index.by_path["Note1.md"]
+        assert note1.tags == []
+        assert note1.description == ""
+
+        note2 = frontmatter_index.by_path["Note2.md"]
+        assert note2.tags == ["project"]
+        assert frontmatter_index.tags == {"project": 1}
 
     def test_scan_extracts_links(self, tmp_vault: Path):
         # Create a note with wikilinks
@@ -181,7 +202,7 @@ class TestVaultScanner:
         scanner = VaultScanner(tmp_vault)
         index = scanner.scan()
 
-        link_note = next((n for n in index.notes if "LinkNote" in n.path), None)
+        link_note = index.by_path.get("LinkNote.md")
         assert link_note is not None
         assert "note1" in link_note.links
         assert "note2" in link_note.links
@@ -194,15 +215,19 @@ class TestVaultScanner:
         scanner = VaultScanner(tmp_vault)
         index = scanner.scan()
 
-        note1 = next((n for n in index.notes if n.path == "Note1.md"), None)
+        note1 = index.by_path.get("Note1.md")
         assert note1 is not None
         assert note1.backlink_count >= 2
 
-    def test_scan_builds_folder_structure(self, tmp_vault: Path):
-        scanner = VaultScanner(tmp_vault)
-        index = scanner.scan()
+    def test_scan_builds_backlink_index(self, tmp_vault: Path):
+        (tmp_vault / "Linker1.md").write_text("Links to [[Note1]]")
+
+        index = VaultScanner(tmp_vault).scan()
+
+        assert "Linker1.md" in index.backlinks["note1"]
 
-        folder_paths = [f.path for f in index.folders]
+    def test_scan_builds_folder_structure(self, shared_index: VaultIndex):
+        folder_paths = [f.path for f in shared_index.folders]
         assert any("Inbox" in p for p in folder_paths)
 
     def test_scan_skips_hidden_folders(self, tmp_vault: Path):
@@ -217,6 +242,15 @@ class TestVaultScanner:
         # Should not include notes from hidden folders
         assert not any(".hidden" in n.path for n in index.notes)
 
+    def test_scan_vault_inside_hidden_directory(self, tmp_path: Path):
+        vault = tmp_path / ".config" / "vault"
+        vault.mkdir(parents=True)
+        (vault / "Note.md").write_text("# Note")
+
+        index = VaultScanner(vault).scan()
+
+        assert [n.path for n in index.notes] == ["Note.md"]
+
     def test_scan_extracts_description(self, tmp_vault: Path):
         # Create a note with content
         (tmp_vault / "DescNote.md").write_text("# Title\n\nThis is the description paragraph.")
@@ -224,10 +258,43 @@ class TestVaultScanner:
         scanner = VaultScanner(tmp_vault)
         index = scanner.scan()
 
-        note = next((n for n in index.notes if "DescNote" in n.path), None)
+        note = index.by_path.get("DescNote.md")
         assert note is not None
         assert "description paragraph" in note.description
 
+    def test_rescan_keeps_touched_but_unedited_notes(self, tmp_vault: Path, monkeypatch):
+        scanner = VaultScanner(tmp_vault)
+        index1 = scanner.scan()
+        note1 = index1.by_path["Note1.md"]
+        note1.summary = "Summary"
+        note1.summary_mtime = note1.mtime + 1
+
+        # Same bytes, later mtime
+        note_path = tmp_vault / "Note1.md"
+        note_path.write_bytes(note_path.read_bytes())
+        future = note1.mtime + 60
+        os.utime(note_path, (future, future))
+
+        monkeypatch.setattr(scanner, "_scan_note", lambda *a: pytest.fail("re-parsed"))
+        index2 = scanner.scan(existing_notes={n.path: n for n in index1.notes})
+
+        touched = index2.by_path["Note1.md"]
+        assert touched.mtime == future
+        assert touched.summary == "Summary"
+        assert not touched.needs_summary()
+
+    def test_scan_reads_crlf_notes(self, tmp_vault: Path):
+        (tmp_vault / "Windows.md").write_bytes(
+            b"---\r\ntitle: From Windows\r\ntags: [crlf]\r\n---\r\n\r\nBody line.\r\n"
+        )
+
+        index = VaultScanner(tmp_vault).scan()
+
+        note = index.by_path["Windows.md"]
+        assert note.title == "From Windows"
+        assert note.tags == ["crlf"]
+        assert note.description == "Body line."
+
     def test_scan_preserves_summaries_for_unchanged_notes(self, tmp_vault: Path):
         # First scan
         scanner = VaultScanner(tmp_vault)
@@ -249,52 +316,70 @@ class TestVaultScanner:
                 assert note.summary == f"Summary for {note.title}"
                 assert note.concepts == ["concept1", "concept2"]
 
+    def test_rescan_reuses_unchanged_notes(self, tmp_vault: Path, monkeypatch):
+        scanner = VaultScanner(tmp_vault)
+        index1 = scanner.scan()
+        existing = {n.path: n for n in index1.notes}
+
+        def fail(*args):
+            raise AssertionError("unchanged note was re-read")
 
-class TestGenerateVaultSummary:
-    """Tests for generate_vault_summary."""
+        monkeypatch.setattr(scanner, "_scan_note", fail)
+        # Matching mtime and size must not even open the file
+        monkeypatch.setattr("knap.indexer.scanner.read_note_bytes", fail)
+        index2 = scanner.scan(existing_notes=existing)
+
+        assert index2.total_notes == index1.total_notes
+        note2 = index2.by_path["Note2.md"]
+        assert note2.title == "Custom Title"
+        assert note2 is not existing["Note2.md"]
 
-    def test_generates_summary(self, tmp_vault: Path):
+    def test_rescan_reads_changed_notes(self, tmp_vault: Path):
         scanner = VaultScanner(tmp_vault)
-        index = scanner.scan()
+        existing = {n.path: n for n in scanner.scan().notes}
 
-        summary = generate_vault_summary(index)
+        # Same mtime, different size: still re-read
+        note_path = tmp_vault / "Note1.md"
+        st = note_path.stat()
+        note_path.write_text("# Renamed Heading\n\nNew body #fresh")
+        os.utime(note_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        index = scanner.scan(existing_notes=existing)
+
+        note1 = index.by_path["Note1.md"]
+        assert note1.title == "Renamed Heading"
+        assert "fresh" in index.tags
+
+
+class TestGenerateVaultSummary:
+    """Tests for generate_vault_summary."""
+
+    def test_generates_summary(self, shared_index: VaultIndex):
+        summary = generate_vault_summary(shared_index)
 
         assert "## Your Vault" in summary
         assert "notes" in summary.lower()
         assert "Structure:" in summary
 
-    def test_includes_tags(self, tmp_vault: Path):
-        scanner = VaultScanner(tmp_vault)
-        index = scanner.scan()
-
-        summary = generate_vault_summary(index)
+    def test_includes_tags(self, shared_index: VaultIndex):
+        summary = generate_vault_summary(shared_index)
 
         assert "Top Tags:" in summary or "Tags:" in summary
 
-    def test_includes_key_notes(self, tmp_vault: Path):
-        scanner = VaultScanner(tmp_vault)
-        index = scanner.scan()
-
-        summary = generate_vault_summary(index)
+    def test_includes_key_notes(self, shared_index: VaultIndex):
+        summary = generate_vault_summary(shared_index)
 
         assert "Key Notes:" in summary
 
-    def test_respects_max_notes(self, tmp_vault: Path):
-        # Create many notes
-        for i in range(50):
-            (tmp_vault / f"Note{i:02d}.md").write_text(f"Content {i}")
+    def test_respects_max_notes(self, shared_index: VaultIndex):
+        summary = generate_vault_summary(shared_index, max_notes=1)
 
-        scanner = VaultScanner(tmp_vault)
-        index = scanner.scan()
+        # Should list one note and mention the rest
+        more = shared_index.total_notes - 1
+        assert f"*... and {more} more notes*" in summary
 
-        summary = generate_vault_summary(index, max_notes=5)
-
-        # Should mention there are more notes
-        assert "more notes" in summary.lower()
-
-    def test_includes_ai_summaries_when_available(self, tmp_vault: Path):
-        scanner = VaultScanner(tmp_vault)
-        index = scanner.scan()
+    def test_includes_ai_summaries_when_available(self, shared_index: VaultIndex):
+        index = copy.deepcopy(shared_index)
 
         # Add AI summaries to notes
         for note in index.notes:
@@ -309,9 +394,8 @@ class TestGenerateVaultSummary:
         # Should include concepts
         assert "productivity" in summary or "Topics:" in summary
 
-    def test_includes_concept_cloud(self, tmp_vault: Path):
-        scanner = VaultScanner(tmp_vault)
-        index = scanner.scan()
+    def test_includes_concept_cloud(self, shared_index: VaultIndex):
+        index = copy.deepcopy(shared_index)
 
         # Add concepts to notes
         for i, note in enumerate(index.notes):
@@ -327,21 +411,46 @@ class TestGenerateVaultSummary:
 class TestGenerateCompactSummary:
     """Tests for generate_compact_summary."""
 
-    def test_generates_compact_summary(self, tmp_vault: Path):
-        scanner = VaultScanner(tmp_vault)
-        index = scanner.scan()
-
-        summary = generate_compact_summary(index)
+    def test_generates_compact_summary(self, shared_index: VaultIndex):
+        summary = generate_compact_summary(shared_index)
 
         assert "Vault:" in summary
         assert "notes" in summary
         assert "|" in summary  # Uses pipe separator
 
-    def test_compact_summary_short(self, tmp_vault: Path):
-        scanner = VaultScanner(tmp_vault)
-        index = scanner.scan()
-
-        summary = generate_compact_summary(index)
+    def test_compact_summary_short(self, shared_index: VaultIndex):
+        summary = generate_compact_summary(shared_index)
 
         # Should be reasonably short
         assert len(summary) < 500
+
+
+@pytest.mark.slow
+class TestLargeVault:
+    """Scanner and summaries on a 500-note vault, where per-note work adds up."""
+
+    def test_scan_counts_notes_tags_and_backlinks(self, big_index: VaultIndex):
+        assert big_index.total_notes == 500
+        assert len(big_index.tags) == 25
+        assert big_index.tags["tag0"] == 20
+        assert big_index.by_path["Folder0/N0.md"].backlink_count == 500
+        assert big_index.by_path["Folder1/N1.md"].backlink_count == 1
+
+    def test_rescan_opens_no_files(self, big_vault: Path, big_index: VaultIndex, monkeypatch):
+        def fail(*args):
+            raise AssertionError("unchanged note was re-read")
+
+        monkeypatch.setattr("knap.indexer.scanner.read_note_bytes", fail)
+        index = VaultScanner(big_vault).scan(existing_notes=big_index.by_path)
+
+        assert index.total_notes == 500
+
+    def test_vault_summary_is_bounded(self, big_index: VaultIndex):
+        summary = generate_vault_summary(big_index)
+
+        assert "*... and 470 more notes*" in summary
+        assert "more folders" in summary
+        assert summary.count("#tag") == 15
+
+    def test_compact_summary_short(self, big_index: VaultIndex):
+        assert len(generate_compact_summary(big_index)) < 500
@@ -1,7 +1,13 @@
 """Tests for storage modules."""
 
+import os
+import time
 from pathlib import Path
 
+import pytest
+
+from knap.indexer.noteio import write_atomic
+from knap.storage import jsonio
 from knap.storage.history import ConversationHistory
 from knap.storage.settings import (
     PendingConfirmationStorage,
@@ -11,6 +17,32 @@ from knap.storage.settings import (
 from knap.storage.vault_index import VaultIndexStorage
 
 
+class TestJsonio:
+    """Tests for the .knap/ JSON codec."""
+
+    def test_round_trip(self):
+        data = {"text": "Olá, 世界", "items": [1, 2.5, None, True]}
+
+        assert jsonio.loads(jsonio.dumps(data)) == data
+        assert jsonio.loads(jsonio.dumps(data, indent=True)) == data
+        assert "Olá".encode() in jsonio.dumps(data)
+
+    def test_non_str_keys_become_strings(self):
+        assert jsonio.loads(jsonio.dumps({2024: 1})) == {"2024": 1}
+
+    def test_write_atomic_replaces_without_leftovers(self, tmp_path: Path):
+        path = tmp_path / "state.json"
+        path.write_bytes(b"old")
+        path.chmod(0o644)
+
+        write_atomic(path, jsonio.dumps({"a": 1}))
+
+        assert jsonio.loads(path.read_bytes()) == {"a": 1}
+        # Files users edit by hand keep their permissions rather than mkstemp's 0600
+        assert path.stat().st_mode & 0o777 == 0o644
+        assert [p.name for p in tmp_path.iterdir()] == ["state.json"]
+
+
 class TestConversationHistory:
     """Tests for ConversationHistory."""
 
@@ -82,9 +114,48 @@ class TestConversationHistory:
         history.add(user_id, {"role": "user", "content": "Hello"})
 
         # Check file is stored in .knap/conversations/
-        expected_path = tmp_vault / ".knap" / "conversations" / f"{user_id}.json"
+        expected_path = tmp_vault / ".knap" / "conversations" / f"{user_id}.jsonl"
         assert expected_path.exists()
 
+    def test_file_compacted_and_reloaded(self, tmp_vault: Path):
+        history = ConversationHistory(tmp_vault, max_messages=5)
+        user_id = 12345
+
+        for i in range(23):
+            history.add(user_id, {"role": "user", "content": f"Message {i}"})
+
+        lines = (tmp_vault / ".knap" / "conversations" / f"{user_id}.jsonl").read_bytes()
+        assert len(lines.splitlines()) <= 10
+
+        messages = ConversationHistory(tmp_vault, max_messages=5).get(user_id)
+        assert [m["content"] for m in messages] == [f"Message {i}" for i in range(18, 23)]
+
+    def test_append_after_torn_line(self, tmp_vault: Path):
+        history = ConversationHistory(tmp_vault)
+        history.add(12345, {"role": "user", "content": "Kept"})
+        path = tmp_vault / ".knap" / "conversations" / "12345.jsonl"
+        # A crash mid-append leaves a partial line without a newline
+        with path.open("ab") as f:
+            f.write(b'{"role": "user", "cont')
+
+        history = ConversationHistory(tmp_vault)
+        history.add(12345, {"role": "user", "content": "After"})
+
+        messages = ConversationHistory(tmp_vault).get(12345)
+        assert [m["content"] for m in messages] == ["Kept", "After"]
+
+    def test_legacy_json_migrated(self, tmp_vault: Path):
+        data_dir = tmp_vault / ".knap" / "conversations"
+        data_dir.mkdir(parents=True)
+        (data_dir / "12345.json").write_bytes(jsonio.dumps([{"role": "user", "content": "Old"}]))
+
+        history = ConversationHistory(tmp_vault)
+        history.add(12345, {"role": "user", "content": "New"})
+
+        assert not (data_dir / "12345.json").exists()
+        messages = ConversationHistory(tmp_vault).get(12345)
+        assert [m["content"] for m in messages] == ["Old", "New"]
+
 
 class TestVaultIndexStorage:
     """Tests for VaultIndexStorage."""
@@ -121,6 +192,24 @@ class TestVaultIndexStorage:
         index = storage.rebuild()
         assert index.total_notes >= 4
 
+    def test_fresh_build_skips_refresh_check(self, tmp_vault: Path, monkeypatch):
+        storage = VaultIndexStorage(tmp_vault)
+        monkeypatch.setattr(storage, "_needs_refresh", lambda: pytest.fail("vault walked"))
+
+        index = storage.get_index()
+        assert index.total_notes >= 3
+
+    def test_loaded_index_refreshes_when_vault_changed(self, tmp_vault: Path):
+        VaultIndexStorage(tmp_vault).get_index()
+
+        new_note = tmp_vault / "NewNote.md"
+        new_note.write_text("New content")
+        future = time.time() + 60
+        os.utime(new_note, (future, future))
+
+        index = VaultIndexStorage(tmp_vault).get_index()
+        assert any(n.path == "NewNote.md" for n in index.notes)
+
     def test_index_contains_tags(self, tmp_vault: Path):
         storage = VaultIndexStorage(tmp_vault)
         index = storage.get_index()
@@ -141,7 +230,7 @@ class TestVaultIndexStorage:
         index = storage.get_index()
 
         # Find Note2 which has frontmatter
-        note2 = next((n for n in index.notes if "Note2" in n.path), None)
+        note2 = index.by_path.get("Note2.md")
         assert note2 is not None
         assert note2.title == "Custom Title"  # From frontmatter
 
@@ -273,6 +362,13 @@ class TestPendingConfirmationStorage:
         user_222_confirmations = storage.get_for_user(222)
         assert len(user_222_confirmations) == 1
 
+        storage.remove(user_111_confirmations[0].confirmation_id)
+        assert [c.tool_name for c in storage.get_for_user(111)] == ["delete_note"]
+        assert [c.tool_name for c in PendingConfirmationStorage(tmp_vault).get_for_user(111)] == [
+            "delete_note"
+        ]
+        assert storage.get_for_user(333) == []
+
     def test_persistence(self, tmp_vault: Path):
         """Test confirmations are persisted to disk."""
         storage1 = PendingConfirmationStorage(tmp_vault)
@@ -1,9 +1,13 @@
 """Tests for vault tools."""
 
+import os
+import shutil
+from datetime import date
 from pathlib import Path
 
 import pytest
 
+from knap.indexer import VaultScanner
 from knap.tools.base import ToolRegistry, ToolResult
 from knap.tools.daily import GetDailyNoteTool
 from knap.tools.edit import EditNoteTool
@@ -32,24 +36,24 @@ class TestToolResult:
 class TestToolRegistry:
     """Tests for ToolRegistry."""
 
-    def test_register_and_get(self, tmp_vault: Path):
+    def test_register_and_get(self, shared_vault: Path):
         registry = ToolRegistry()
-        tool = ReadNoteTool(tmp_vault)
+        tool = ReadNoteTool(shared_vault)
         registry.register(tool)
 
         assert registry.get("read_note") is tool
         assert registry.get("nonexistent") is None
 
-    def test_execute_unknown_tool(self, tmp_vault: Path):
+    def test_execute_unknown_tool(self, shared_vault: Path):
         registry = ToolRegistry()
         result = registry.execute("unknown_tool")
         assert result.success is False
         assert "Unknown tool" in result.message
 
-    def test_get_openai_tools(self, tmp_vault: Path):
+    def test_get_openai_tools(self, shared_vault: Path):
         registry = ToolRegistry()
-        registry.register(ReadNoteTool(tmp_vault))
-        registry.register(GrepNotesTool(tmp_vault))
+        registry.register(ReadNoteTool(shared_vault))
+        registry.register(GrepNotesTool(shared_vault))
 
         tools = registry.get_openai_tools()
         assert len(tools) == 2
@@ -60,36 +64,30 @@ class TestToolRegistry:
 class TestReadNoteTool:
     """Tests for ReadNoteTool."""
 
-    def test_read_existing_note(self, tmp_vault: Path):
-        tool = ReadNoteTool(tmp_vault)
-        result = tool.execute(path="Note1.md")
+    @pytest.mark.parametrize(
+        ("path", "expected"),
+        [
+            ("Note1.md", "This is note 1 content."),
+            ("Note1", "This is note 1 content."),
+            ("Inbox/Task.md", "Buy groceries"),
+        ],
+        ids=["existing", "without_extension", "subfolder"],
+    )
+    def test_read_note(self, shared_vault: Path, path, expected):
+        tool = ReadNoteTool(shared_vault)
+        result = tool.execute(path=path)
 
         assert result.success is True
         # Output now includes line numbers
-        assert "Note 1" in result.data
-        assert "content" in result.data.lower()
-
-    def test_read_note_without_extension(self, tmp_vault: Path):
-        tool = ReadNoteTool(tmp_vault)
-        result = tool.execute(path="Note1")
-
-        assert result.success is True
-        assert "Note 1" in result.data
+        assert expected in result.data
 
-    def test_read_nonexistent_note(self, tmp_vault: Path):
-        tool = ReadNoteTool(tmp_vault)
+    def test_read_nonexistent_note(self, shared_vault: Path):
+        tool = ReadNoteTool(shared_vault)
         result = tool.execute(path="Nonexistent.md")
 
         assert result.success is False
         assert "not found" in result.message.lower()
 
-    def test_read_note_in_subfolder(self, tmp_vault: Path):
-        tool = ReadNoteTool(tmp_vault)
-        result = tool.execute(path="Inbox/Task.md")
-
-        assert result.success is True
-        assert "Buy groceries" in result.data
-
     def test_read_note_with_offset_and_limit(self, tmp_vault: Path):
         # Create a note with multiple lines
         (tmp_vault / "MultiLine.md").write_text("Line 1\nLine 2\nLine 3\nLine 4\nLine 5")
@@ -103,100 +101,147 @@ class TestReadNoteTool:
         assert "Line 1" not in result.data
         assert "lines 2-3 of 5" in result.message
 
+    def test_read_after_same_size_update(self, tmp_vault: Path):
+        (tmp_vault / "Cached.md").write_text("alpha\n")
+        tool = ReadNoteTool(tmp_vault)
+        assert "alpha" in tool.execute(path="Cached.md").data
+
+        UpdateNoteTool(tmp_vault).execute(path="Cached.md", content="omega\n")
+        result = tool.execute(path="Cached.md")
+
+        assert "omega" in result.data
+        assert "alpha" not in result.data
+
 
 class TestGlobNotesTool:
     """Tests for GlobNotesTool."""
 
-    def test_glob_all_notes(self, tmp_vault: Path):
-        tool = GlobNotesTool(tmp_vault)
+    def test_glob_all_notes(self, shared_vault: Path):
+        tool = GlobNotesTool(shared_vault)
         result = tool.execute(pattern="**/*.md")
 
         assert result.success is True
         assert len(result.data) >= 3  # At least Note1, Note2, Task
 
-    def test_glob_specific_folder(self, tmp_vault: Path):
-        tool = GlobNotesTool(tmp_vault)
+    def test_glob_specific_folder(self, shared_vault: Path):
+        tool = GlobNotesTool(shared_vault)
         result = tool.execute(pattern="Inbox/*.md")
 
         assert result.success is True
-        assert any("Task.md" in p for p in result.data)
+        assert result.data == ["Inbox/Task.md"]
 
-    def test_glob_by_name_pattern(self, tmp_vault: Path):
-        tool = GlobNotesTool(tmp_vault)
+    def test_glob_by_name_pattern(self, shared_vault: Path):
+        tool = GlobNotesTool(shared_vault)
         result = tool.execute(pattern="*Note*.md")
 
         assert result.success is True
         assert len(result.data) >= 2
 
-    def test_glob_no_match(self, tmp_vault: Path):
-        tool = GlobNotesTool(tmp_vault)
+    def test_glob_no_match(self, shared_vault: Path):
+        tool = GlobNotesTool(shared_vault)
         result = tool.execute(pattern="*nonexistent*.md")
 
         assert result.success is True
         assert result.data == []
 
+    @pytest.mark.parametrize("max_results", [0, -1])
+    def test_glob_rejects_non_positive_max_results(self, shared_vault: Path, max_results):
+        tool = GlobNotesTool(shared_vault)
+        result = tool.execute(pattern="**/*.md", max_results=max_results)
+
+        assert result.success is False
+        assert "max_results" in result.message
+
+    @pytest.mark.parametrize("use_rg", [False, True], ids=["walk", "ripgrep"])
+    def test_list_backends(self, tmp_vault: Path, monkeypatch, use_rg):
+        if use_rg and not shutil.which("rg"):
+            pytest.skip("ripgrep is not installed")
+        monkeypatch.setattr("knap.tools.glob._RG", shutil.which("rg") if use_rg else None)
+        (tmp_vault / ".trash").mkdir()
+        (tmp_vault / ".trash" / "Old.md").write_text("Deleted")
+        (tmp_vault / "Inbox" / "Ünï.md").write_text("Unicode name")
+        os.utime(tmp_vault / "Inbox" / "Task.md", (1_000_000_000, 1_000_000_000))
+        os.utime(tmp_vault / "Inbox" / "Ünï.md", (2_000_000_000, 2_000_000_000))
+        tool = GlobNotesTool(tmp_vault)
+
+        # Folder prefix is matched case-insensitively; results are newest first
+        assert tool.execute(pattern="inbox/*.md").data == ["Inbox/Ünï.md", "Inbox/Task.md"]
+        assert not any(p.startswith(".trash") for p in tool.execute(pattern="**/*.md").data)
+
+    def test_glob_max_results_keeps_newest(self, tmp_vault: Path):
+        os.utime(tmp_vault / "Note2.md", (4_000_000_000, 4_000_000_000))
+
+        tool = GlobNotesTool(tmp_vault)
+        result = tool.execute(pattern="**/*.md", max_results=1)
+
+        assert result.data == ["Note2.md"]
+
 
 class TestGrepNotesTool:
     """Tests for GrepNotesTool."""
 
-    def test_grep_files_with_matches(self, tmp_vault: Path):
-        tool = GrepNotesTool(tmp_vault)
+    def test_grep_files_with_matches(self, shared_vault: Path):
+        tool = GrepNotesTool(shared_vault)
         result = tool.execute(pattern="content", output_mode="files_with_matches")
 
         assert result.success is True
         assert len(result.data) >= 1
         assert isinstance(result.data[0], str)  # Just paths
 
-    def test_grep_content_mode(self, tmp_vault: Path):
-        tool = GrepNotesTool(tmp_vault)
-        result = tool.execute(pattern="content", output_mode="content")
+    @pytest.mark.parametrize(
+        ("output_mode", "key"),
+        [("content", "matches"), ("count", "count")],
+        ids=["content", "count"],
+    )
+    def test_grep_output_modes(self, shared_vault: Path, output_mode, key):
+        tool = GrepNotesTool(shared_vault)
+        result = tool.execute(pattern="content", output_mode=output_mode)
 
         assert result.success is True
         assert len(result.data) >= 1
         assert "path" in result.data[0]
-        assert "matches" in result.data[0]
-
-    def test_grep_count_mode(self, tmp_vault: Path):
-        tool = GrepNotesTool(tmp_vault)
-        result = tool.execute(pattern="content", output_mode="count")
+        assert key in result.data[0]
 
-        assert result.success is True
-        assert len(result.data) >= 1
-        assert "path" in result.data[0]
-        assert "count" in result.data[0]
-
-    def test_grep_no_match(self, tmp_vault: Path):
-        tool = GrepNotesTool(tmp_vault)
+    def test_grep_no_match(self, shared_vault: Path):
+        tool = GrepNotesTool(shared_vault)
         result = tool.execute(pattern="xyznonexistent123")
 
         assert result.success is True
         assert result.data == []
 
-    def test_grep_case_insensitive(self, tmp_vault: Path):
-        tool = GrepNotesTool(tmp_vault)
+    def test_grep_case_insensitive(self, shared_vault: Path):
+        tool = GrepNotesTool(shared_vault)
         result = tool.execute(pattern="NOTE", case_insensitive=True)
 
         assert result.success is True
         assert len(result.data) >= 1
 
-    def test_grep_max_results(self, tmp_vault: Path):
+    def test_grep_large_note(self, tmp_vault: Path):
+        filler = "lorem ipsum\n" * 10000
+        (tmp_vault / "Big.md").write_text(filler + "needle here\n", encoding="utf-8")
+        (tmp_vault / "BigMiss.md").write_text(filler, encoding="utf-8")
         tool = GrepNotesTool(tmp_vault)
+        result = tool.execute(pattern="needle", case_insensitive=False, output_mode="count")
+
+        assert result.data == [{"path": "Big.md", "count": 1}]
+
+    def test_grep_max_results(self, shared_vault: Path):
+        tool = GrepNotesTool(shared_vault)
         result = tool.execute(pattern=".", max_results=1)  # Match anything
 
         assert result.success is True
         assert len(result.data) <= 1
 
-    def test_grep_with_glob_filter(self, tmp_vault: Path):
-        tool = GrepNotesTool(tmp_vault)
+    def test_grep_with_glob_filter(self, shared_vault: Path):
+        tool = GrepNotesTool(shared_vault)
         result = tool.execute(pattern=".", glob="Inbox/*")  # Only search Inbox
 
         assert result.success is True
         # Should only find notes in Inbox
-        for path in result.data:
-            assert "Inbox" in path
+        assert result.data == ["Inbox/Task.md"]
 
-    def test_grep_regex_pattern(self, tmp_vault: Path):
-        tool = GrepNotesTool(tmp_vault)
+    def test_grep_regex_pattern(self, shared_vault: Path):
+        tool = GrepNotesTool(shared_vault)
         result = tool.execute(pattern=r"#\w+")  # Match tags
 
         assert result.success is True
@@ -206,30 +251,65 @@ class TestGrepNotesTool:
 class TestSearchByTagTool:
     """Tests for SearchByTagTool."""
 
-    def test_search_inline_tag(self, tmp_vault: Path):
-        tool = SearchByTagTool(tmp_vault)
+    def test_search_inline_tag(self, shared_vault: Path):
+        tool = SearchByTagTool(shared_vault)
         result = tool.execute(tag="tag1")
 
         assert result.success is True
-        assert len(result.data) >= 1
-        assert "Note1.md" in result.data
+        assert result.data == ["Note1.md"]
 
-    def test_search_tag_with_hash(self, tmp_vault: Path):
-        tool = SearchByTagTool(tmp_vault)
+    def test_search_tag_with_hash(self, shared_vault: Path):
+        tool = SearchByTagTool(shared_vault)
         result = tool.execute(tag="#tag1")
 
         assert result.success is True
         assert len(result.data) >= 1
 
-    def test_search_frontmatter_tag(self, tmp_vault: Path):
-        tool = SearchByTagTool(tmp_vault)
+    def test_search_frontmatter_tag(self, shared_vault: Path):
+        tool = SearchByTagTool(shared_vault)
         result = tool.execute(tag="project")
 
         assert result.success is True
         assert "Note2.md" in result.data
 
-    def test_search_nonexistent_tag(self, tmp_vault: Path):
+    def test_search_tag_in_crlf_and_unicode_notes(self, tmp_vault: Path):
+        (tmp_vault / "Windows.md").write_bytes(b"tags:\r\n[misc, Errand]\r\n")
+        (tmp_vault / "Accents.md").write_text("Café #errand\n", encoding="utf-8")
+        (tmp_vault / "Word.md").write_text("#errandé\n", encoding="utf-8")
+        tool = SearchByTagTool(tmp_vault)
+        result = tool.execute(tag="errand")
+
+        assert sorted(result.data) == ["Accents.md", "Windows.md"]
+
+    def test_frontmatter_tag_must_be_inside_list(self, tmp_vault: Path):
+        (tmp_vault / "Listed.md").write_text("---\ntags: [\n  misc,\n  chores\n]\n---\n")
+        (tmp_vault / "Outside.md").write_text("---\ntags: [misc]\n---\nchores later]\n")
         tool = SearchByTagTool(tmp_vault)
+        result = tool.execute(tag="chores")
+
+        assert result.data == ["Listed.md"]
+
+    def test_repeat_search_sees_changed_notes(self, tmp_vault: Path):
+        tool = SearchByTagTool(tmp_vault)
+        assert "Note2.md" not in tool.execute(tag="tag1").data
+
+        AppendToNoteTool(tmp_vault).execute(path="Note2.md", content="#tag1")
+        (tmp_vault / "Note1.md").unlink()
+        result = tool.execute(tag="tag1")
+
+        assert "Note2.md" in result.data
+        assert "Note1.md" not in result.data
+
+    def test_search_skips_hidden_folders(self, tmp_vault: Path):
+        (tmp_vault / ".obsidian").mkdir()
+        (tmp_vault / ".obsidian" / "Cache.md").write_text("#tag1\n", encoding="utf-8")
+        tool = SearchByTagTool(tmp_vault)
+        result = tool.execute(tag="tag1")
+
+        assert not any(path.startswith(".obsidian") for path in result.data)
+
+    def test_search_nonexistent_tag(self, shared_vault: Path):
+        tool = SearchByTagTool(shared_vault)
         result = tool.execute(tag="nonexistenttag")
 
         assert result.success is True
@@ -244,7 +324,7 @@ class TestCreateNoteTool:
         result = tool.execute(path="NewNote.md", content="New content")
 
         assert result.success is True
-        assert (tmp_vault / "NewNote.md").exists()
+        # read_text() raises if the note was not created
         assert (tmp_vault / "NewNote.md").read_text() == "New content"
 
     def test_create_note_in_subfolder(self, tmp_vault: Path):
@@ -293,6 +373,17 @@ class TestAppendToNoteTool:
         assert original in new_content
         assert "Appended text" in new_content
 
+    def test_append_adds_missing_newline(self, tmp_vault: Path):
+        (tmp_vault / "NoNewline.md").write_text("First", encoding="utf-8")
+        (tmp_vault / "Empty.md").write_text("", encoding="utf-8")
+        tool = AppendToNoteTool(tmp_vault)
+        tool.execute(path="NoNewline.md", content="Second\n")
+        tool.execute(path="NoNewline.md", content="Third")
+        tool.execute(path="Empty.md", content="Only")
+
+        assert (tmp_vault / "NoNewline.md").read_text() == "First\nSecond\nThird"
+        assert (tmp_vault / "Empty.md").read_text() == "Only"
+
     def test_append_to_nonexistent_note_fails(self, tmp_vault: Path):
         tool = AppendToNoteTool(tmp_vault)
         result = tool.execute(path="Nonexistent.md", content="Content")
@@ -380,8 +471,8 @@ class TestEditNoteTool:
 class TestListFolderTool:
     """Tests for ListFolderTool."""
 
-    def test_list_root(self, tmp_vault: Path):
-        tool = ListFolderTool(tmp_vault)
+    def test_list_root(self, shared_vault: Path):
+        tool = ListFolderTool(shared_vault)
         result = tool.execute(path="")
 
         assert result.success is True
@@ -389,16 +480,16 @@ class TestListFolderTool:
         assert "Note1.md" in note_paths
         assert "Inbox" in result.data["folders"]
 
-    def test_list_subfolder(self, tmp_vault: Path):
-        tool = ListFolderTool(tmp_vault)
+    def test_list_subfolder(self, shared_vault: Path):
+        tool = ListFolderTool(shared_vault)
         result = tool.execute(path="Inbox")
 
         assert result.success is True
         note_paths = [n["path"] for n in result.data["notes"]]
         assert "Inbox/Task.md" in note_paths
 
-    def test_list_nonexistent_folder(self, tmp_vault: Path):
-        tool = ListFolderTool(tmp_vault)
+    def test_list_nonexistent_folder(self, shared_vault: Path):
+        tool = ListFolderTool(shared_vault)
         result = tool.execute(path="NonexistentFolder")
 
         assert result.success is False
@@ -417,27 +508,74 @@ class TestGetBacklinksTool:
         assert result.success is True
         assert "Linking.md" in result.data
 
-    def test_no_backlinks(self, tmp_vault: Path):
-        tool = GetBacklinksTool(tmp_vault)
+    @pytest.mark.parametrize("use_rg", [False, True], ids=["walk", "ripgrep"])
+    def test_skips_hidden_folders(self, tmp_vault: Path, monkeypatch, use_rg):
+        if use_rg and not shutil.which("rg"):
+            pytest.skip("ripgrep is not installed")
+        monkeypatch.setattr("knap.tools.navigate._RG", shutil.which("rg") if use_rg else None)
+        (tmp_vault / ".trash").mkdir()
+        (tmp_vault / ".trash" / "Old.md").write_text("This links to [[Note1]]")
+
+        result = GetBacklinksTool(tmp_vault).execute(path="Note1.md")
+
+        assert result.data == []
+
+    def test_no_backlinks(self, shared_vault: Path):
+        tool = GetBacklinksTool(shared_vault)
         result = tool.execute(path="Note2.md")
 
         assert result.success is True
         assert result.data == []
 
+    def test_uses_fresh_index(self, tmp_vault: Path):
+        (tmp_vault / "Linking.md").write_text("This links to [[Note1]]")
+        index = VaultScanner(tmp_vault).scan()
+        # Content changes are invisible until mtimes pass last_indexed
+        index.backlinks["note1"] = ["Note2.md"]
+
+        tool = GetBacklinksTool(tmp_vault)
+        tool.set_index_provider(lambda: index)
+        result = tool.execute(path="Note1.md")
+
+        assert result.data == ["Note2.md"]
+
+    def test_renamed_linking_note_falls_back_to_scan(self, tmp_vault: Path):
+        (tmp_vault / "Linker.md").write_text("This links to [[Note1]]")
+        index = VaultScanner(tmp_vault).scan()
+        # A rename keeps the note's mtime, so only the changed path gives it away
+        (tmp_vault / "Linker.md").rename(tmp_vault / "Renamed.md")
+
+        tool = GetBacklinksTool(tmp_vault)
+        tool.set_index_provider(lambda: index)
+        result = tool.execute(path="Note1.md")
+
+        assert result.data == ["Renamed.md"]
+
+    def test_stale_index_falls_back_to_scan(self, tmp_vault: Path):
+        index = VaultScanner(tmp_vault).scan()
+        index.last_indexed = 0.0
+        (tmp_vault / "Linking.md").write_text("This links to [[Note1]]")
+
+        tool = GetBacklinksTool(tmp_vault)
+        tool.set_index_provider(lambda: index)
+        result = tool.execute(path="Note1.md")
+
+        assert result.data == ["Linking.md"]
+
 
 class TestGetFrontmatterTool:
     """Tests for GetFrontmatterTool."""
 
-    def test_get_frontmatter(self, tmp_vault: Path):
-        tool = GetFrontmatterTool(tmp_vault)
+    def test_get_frontmatter(self, shared_vault: Path):
+        tool = GetFrontmatterTool(shared_vault)
         result = tool.execute(path="Note2.md")
 
         assert result.success is True
         assert result.data["title"] == "Custom Title"
         assert "project" in result.data["tags"]
 
-    def test_no_frontmatter(self, tmp_vault: Path):
-        tool = GetFrontmatterTool(tmp_vault)
+    def test_no_frontmatter(self, shared_vault: Path):
+        tool = GetFrontmatterTool(shared_vault)
         result = tool.execute(path="Note1.md")
 
         assert result.success is True
@@ -463,6 +601,40 @@ class TestSetFrontmatterTool:
         content = (tmp_vault / "Note2.md").read_text()
         assert "title: New Title" in content
 
+    def test_get_after_set_sees_update(self, tmp_vault: Path):
+        GetFrontmatterTool(tmp_vault).execute(path="Note2.md")
+        SetFrontmatterTool(tmp_vault).execute(path="Note2.md", frontmatter={"title": "Renamed"})
+
+        result = GetFrontmatterTool(tmp_vault).execute(path="Note2.md")
+        assert result.data["title"] == "Renamed"
+
+    def test_get_after_same_size_edit_sees_update(self, tmp_vault: Path):
+        note = tmp_vault / "Note2.md"
+        st = note.stat()
+        GetFrontmatterTool(tmp_vault).execute(path="Note2.md")
+
+        EditNoteTool(tmp_vault).execute(path="Note2.md", old_string="Custom", new_string="Edited")
+        # Same size and, as within one timestamp tick, the same mtime
+        os.utime(note, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        result = GetFrontmatterTool(tmp_vault).execute(path="Note2.md")
+        assert result.data["title"] == "Edited Title"
+
+    def test_set_after_same_size_edit_keeps_edit(self, tmp_vault: Path):
+        note = tmp_vault / "Status.md"
+        note.write_text("---\nstatus: todo\n---\nbody A")
+        st = note.stat()
+        GetFrontmatterTool(tmp_vault).execute(path="Status.md")
+
+        note.write_text("---\nstatus: done\n---\nbody B")
+        os.utime(note, ns=(st.st_atime_ns, st.st_mtime_ns))
+        SetFrontmatterTool(tmp_vault).execute(path="Status.md", frontmatter={"x": 1})
+
+        content = note.read_text()
+        assert "status: done" in content
+        assert "x: 1" in content
+        assert content.endswith("body B")
+
 
 class TestGetDailyNoteTool:
     """Tests for GetDailyNoteTool."""
@@ -472,15 +644,12 @@ class TestGetDailyNoteTool:
         result = tool.execute()
 
         assert result.success is True
-        assert "path" in result.data
-        # Check that a daily note was created
-        daily_folder = tmp_vault / "Daily Notes"
-        assert any(daily_folder.iterdir())
+        assert result.data["path"] == f"Daily Notes/{date.today().isoformat()}.md"
+        # Check that the daily note was created
+        assert (tmp_vault / result.data["path"]).is_file()
 
     def test_get_daily_note_returns_existing(self, tmp_vault: Path):
         # Create today's daily note
-        from datetime import date
-
         daily_folder = tmp_vault / "Daily Notes"
         today = date.today().isoformat()
         daily_note = daily_folder / f"{today}.md"
@@ -496,14 +665,24 @@ class TestGetDailyNoteTool:
 class TestPathSecurity:
     """Tests for path traversal security."""
 
-    def test_path_escape_blocked(self, tmp_vault: Path):
-        tool = ReadNoteTool(tmp_vault)
+    def test_path_escape_blocked(self, shared_vault: Path):
+        tool = ReadNoteTool(shared_vault)
 
         with pytest.raises(ValueError, match="escapes vault"):
             tool._validate_path("../../../etc/passwd")
 
-    def test_absolute_path_normalized(self, tmp_vault: Path):
+    def test_symlink_escape_blocked(self, tmp_vault: Path, tmp_path: Path):
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (tmp_vault / "Link").symlink_to(outside, target_is_directory=True)
         tool = ReadNoteTool(tmp_vault)
+
+        # Lexically inside the vault, but resolves outside it
+        with pytest.raises(ValueError, match="escapes vault"):
+            tool._validate_path("Link/secret.md")
+
+    def test_absolute_path_normalized(self, shared_vault: Path):
+        tool = ReadNoteTool(shared_vault)
         result = tool._validate_path("/Note1.md")
 
-        assert result == tmp_vault / "Note1.md"
+        assert result == shared_vault / "Note1.md"